@@ -21,12 +21,18 @@ def create_app(config_name=None):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
     
+    from app.utils.serializers import FastJSONProvider
+    app.json = FastJSONProvider(app)
+    
     # Initialize extensions with app
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
     bcrypt.init_app(app)
     
+    from app.utils import events
+    events.init_app(app)
+    
 # Configure CORS
     CORS(app, resources={
         r"/api/*": {
@@ -65,6 +71,10 @@ def create_app(config_name=None):
     app.register_blueprint(bookings.bp, url_prefix='/api/bookings')
     app.register_blueprint(inventory.bp, url_prefix='/api/inventory')
     
+    # Register CLI commands
+    from app.commands import register_commands
+    register_commands(app)
+    
     # Health check route
     @app.route('/health')
     def health_check():
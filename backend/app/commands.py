@@ -0,0 +1,238 @@
+import click
+import time
+import numpy as np
+from types import SimpleNamespace
+from flask import current_app
+from flask.cli import AppGroup
+
+stats_cli = AppGroup('stats', help='Booking statistics maintenance.')
+pricing_cli = AppGroup('pricing', help='Pricing engine tools.')
+geo_cli = AppGroup('geo', help='Mover coverage index maintenance.')
+schedule_cli = AppGroup('schedule', help='Mover calendar maintenance.')
+tracking_cli = AppGroup('tracking', help='GPS ping storage maintenance.')
+plans_cli = AppGroup('plans', help='Query plan regression checks.')
+serialize_cli = AppGroup('serialize', help='JSON serialization tools.')
+
+@stats_cli.command('rebuild')
+def rebuild_stats():
+    """Backfill the booking_daily_stats rollup from booking history"""
+    from app.models import BookingDailyStat
+    
+    rows = BookingDailyStat.rebuild()
+    click.echo(f'Rebuilt booking_daily_stats: {rows} rows')
+
+@stats_cli.command('reconcile-ratings')
+def reconcile_ratings():
+    """Recompute mover review counts and ratings in one grouped pass"""
+    from app.models import Mover
+    
+    updated = Mover.reconcile_review_stats()
+    click.echo(f'Reconciled ratings for {updated} reviewed movers')
+
+@pricing_cli.command('bench')
+@click.option('--iterations', default=100000, help='Quotes to evaluate.')
+@click.option('--movers', default=1000, help='Synthetic movers for the batch run.')
+def bench_pricing(iterations, movers):
+    """Measure quote evaluation throughput against the loaded rules"""
+    from app.utils.pricing import calculate_pricing, pricing_engine, price_all_movers
+    
+    pricing_engine.rule_set()  # load rules outside the timed loop
+    mover = SimpleNamespace(id=1, base_price_per_km=100.0, price_per_cubic_meter=500.0, pricing_zone='nairobi')
+    trips = [(1.0 + i % 50, 0.5 + (i % 40) * 0.5) for i in range(iterations)]
+    
+    started = time.perf_counter()
+    for distance_km, total_volume in trips:
+        calculate_pricing(distance_km, total_volume, mover)
+    elapsed = time.perf_counter() - started
+    click.echo(f'single quote: {iterations} in {elapsed:.3f}s '
+               f'({elapsed / iterations * 1e6:.2f} us/quote, {iterations / elapsed:,.0f} quotes/s)')
+    
+    table = {
+        'ids': np.arange(1, movers + 1, dtype=np.int64),
+        'names': [f'Mover {i}' for i in range(1, movers + 1)],
+        'ratings': np.full(movers, 4.5),
+        'capacity': np.full(movers, 15.0),
+        'per_km': np.linspace(80, 150, movers),
+        'per_m3': np.linspace(400, 700, movers),
+        'zones': ['nairobi'] * movers
+    }
+    batch = trips[:20]
+    started = time.perf_counter()
+    price_all_movers(batch, max_age=current_app.config['PRICE_TABLE_MAX_AGE'], table=table)
+    elapsed = time.perf_counter() - started
+    quotes = len(batch) * movers
+    click.echo(f'batch quotes: {quotes} in {elapsed:.3f}s ({elapsed / quotes * 1e6:.2f} us/quote)')
+
+@geo_cli.command('rebuild-cells')
+def rebuild_coverage_cells():
+    """Recompute geohash coverage cells for every mover"""
+    from app import db
+    from app.models import Mover
+    
+    total = 0
+    for mover in Mover.query.all():
+        total += mover.refresh_coverage_cells()
+    db.session.commit()
+    click.echo(f'Rebuilt mover_coverage_cells: {total} cells')
+
+@geo_cli.command('rebuild-zones')
+def rebuild_mover_zones():
+    """Recompute the mover_zones index from coverage_zones"""
+    from app import db
+    from app.models import Mover, MoverZone
+    from app.models.mover import sync_mover_zones
+    
+    connection = db.session.connection()
+    for mover in Mover.query.all():
+        sync_mover_zones(connection, mover)
+    db.session.commit()
+    click.echo(f'Rebuilt mover_zones: {MoverZone.query.count()} rows')
+
+@schedule_cli.command('rebuild-slots')
+def rebuild_slots():
+    """Recompute mover slot reservations from active bookings"""
+    from app.models import MoverSlot
+    
+    reserved, conflicts = MoverSlot.rebuild()
+    click.echo(f'Rebuilt mover_slots: {reserved} reserved, {conflicts} conflicting bookings')
+
+@tracking_cli.command('partitions')
+@click.option('--months-ahead', default=2, help='Future months to create partitions for.')
+def create_ping_partitions(months_ahead):
+    """Create monthly location_pings partitions (PostgreSQL)"""
+    from app.models import LocationPing
+    
+    created = LocationPing.ensure_partitions(months_ahead=months_ahead)
+    click.echo(f'Created {len(created)} location_pings partitions' + (f": {', '.join(created)}" if created else ''))
+
+@plans_cli.command('check')
+@click.option('--bookings', default=200000, help='Synthetic bookings to generate.')
+@click.option('--baseline', type=click.Path(), help='JSON file of per-query plan costs to compare against.')
+@click.option('--tolerance', default=1.5, help='Allowed cost growth over the baseline.')
+@click.option('--write-baseline', is_flag=True, help='Record current costs into --baseline instead of comparing.')
+@click.pass_context
+def check_query_plans(ctx, bookings, baseline, tolerance, write_baseline):
+    """EXPLAIN hot route queries over a synthetic dataset (PostgreSQL, rolled back)"""
+    import json
+    import os
+    from app import db
+    from app.utils.query_plans import check_plans, seed_synthetic
+    
+    if db.engine.dialect.name != 'postgresql':
+        raise click.ClickException('Query plan checks need PostgreSQL')
+    
+    expected = None
+    if baseline and not write_baseline and os.path.exists(baseline):
+        with open(baseline) as f:
+            recorded = json.load(f)
+        if recorded['bookings'] != bookings:
+            raise click.ClickException(f"Baseline was recorded with --bookings {recorded['bookings']}")
+        expected = recorded['costs']
+    
+    try:
+        started = time.perf_counter()
+        seed_synthetic(bookings=bookings, clients=max(bookings // 10, 1))
+        click.echo(f'Seeded {bookings} synthetic bookings in {time.perf_counter() - started:.1f}s')
+        results = check_plans(baseline=expected, tolerance=tolerance)
+    finally:
+        db.session.rollback()
+    
+    failed = False
+    for result in results:
+        status = 'FAIL' if result['problems'] else 'ok'
+        failed = failed or bool(result['problems'])
+        click.echo(f"{status:4}  {result['name']:28} cost={result['cost']:<10.1f} {', '.join(result['scans'])}")
+        for problem in result['problems']:
+            click.echo(f'      - {problem}')
+    
+    if write_baseline and baseline:
+        with open(baseline, 'w') as f:
+            json.dump({
+                'bookings': bookings,
+                'costs': {result['name']: result['cost'] for result in results}
+            }, f, indent=2, sort_keys=True)
+        click.echo(f'Wrote baseline to {baseline}')
+    
+    if failed:
+        ctx.exit(1)
+
+@serialize_cli.command('bench')
+@click.option('--rows', default=2000, help='Synthetic bookings per payload.')
+@click.option('--repeat', default=5, help='Timed runs per path (best is reported).')
+def bench_serialize(rows, repeat):
+    """Compare Booking.to_dict + json against the compiled serializer plans"""
+    import json
+    from datetime import date, datetime, time as dt_time
+    from app.models import Booking, BookingStatus, Mover, User, UserRole
+    from app.utils.serializers import dumps_bytes, serialize
+    
+    def loaded(model, **values):
+        # Every column set, as on a row loaded from a query
+        columns = {attr.key: None for attr in model.__mapper__.column_attrs}
+        return model(**{**columns, **values})
+    
+    now = datetime.utcnow()
+    bookings = []
+    for i in range(rows):
+        client = loaded(User, id=i, email=f'client{i}@example.invalid', full_name=f'Client {i}',
+                        phone_number='0700000000', role=UserRole.CLIENT)
+        mover_user = loaded(User, id=rows + i, email=f'mover{i}@example.invalid', full_name=f'Mover {i}',
+                            phone_number='0711111111', role=UserRole.MOVER)
+        mover = loaded(Mover, id=i, user=mover_user, company_name=f'Movers {i}', vehicle_capacity=15.0,
+                       coverage_zones=['nairobi', 'westlands'], base_price_per_km=100.0, price_per_cubic_meter=500.0,
+                       is_approved=True, is_available=True, rating=4.25, total_jobs_completed=i, review_count=i,
+                       created_at=now)
+        bookings.append(loaded(
+            Booking, id=i, booking_reference=f'SM-{i:08d}', client=client, mover=mover, status=BookingStatus.CONFIRMED,
+            pickup_address=f'{i} Pickup Road', dropoff_address=f'{i} Dropoff Avenue',
+            scheduled_date=date.today(), scheduled_time=dt_time(9, 30), distance_km=12.5, total_volume=8.0,
+            items_count=14, base_price=1250.0, labor_cost=4000.0, packing_materials_cost=0.0,
+            service_fee=262.5, total_price=5512.5, created_at=now
+        ))
+    
+    paths = {
+        'to_dict + json': lambda: json.dumps(
+            [booking.to_dict(include_client=True, include_mover=True) for booking in bookings]
+        ).encode(),
+        'serializer + orjson': lambda: dumps_bytes(serialize('booking.admin', bookings)),
+    }
+    outputs, timings = {}, {}
+    for name, run in paths.items():
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            outputs[name] = run()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+    
+    baseline = timings['to_dict + json']
+    for name, elapsed in timings.items():
+        click.echo(f'{name}: {rows} bookings in {elapsed * 1000:.1f}ms '
+                   f'({elapsed / rows * 1e6:.2f} us/booking, {baseline / elapsed:.1f}x)')
+    
+    same = [json.loads(payload) for payload in outputs.values()]
+    click.echo('outputs match' if all(payload == same[0] for payload in same) else 'OUTPUTS DIFFER')
+
+@serialize_cli.command('check')
+@click.pass_context
+def check_serializers(ctx):
+    """Verify each registered serializer plan still matches its model's to_dict"""
+    from app.utils.serializers import check_parity
+    
+    problems = check_parity()
+    for name, difference in problems:
+        click.echo(f'FAIL {name}: {difference}')
+    if problems:
+        ctx.exit(1)
+    click.echo('All serializer plans match to_dict')
+
+def register_commands(app):
+    """Attach maintenance CLI groups to the app"""
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(pricing_cli)
+    app.cli.add_command(geo_cli)
+    app.cli.add_command(schedule_cli)
+    app.cli.add_command(tracking_cli)
+    app.cli.add_command(plans_cli)
+    app.cli.add_command(serialize_cli)
@@ -1,6 +1,6 @@
 from app.models.user import User, UserRole
-from app.models.mover import Mover
-from app.models.booking import Booking, BookingStatus
+from app.models.mover import Mover, MoverCoverageCell, MoverZone
+from app.models.booking import Booking, BookingStatus, MoverSlot
 from app.models.inventory import (
     InventoryTemplate, 
     UserInventory, 
@@ -9,17 +9,27 @@ from app.models.inventory import (
     BookingStatusUpdate,
     RoomType
 )
+from app.models.stats import BookingDailyStat
+from app.models.pricing import PricingRule, PricingRuleType
+from app.models.tracking import LocationPing
 
 __all__ = [
     'User',
     'UserRole',
     'Mover',
+    'MoverCoverageCell',
+    'MoverZone',
     'Booking',
     'BookingStatus',
+    'MoverSlot',
     'InventoryTemplate',
     'UserInventory',
     'InventoryItem',
     'Review',
     'BookingStatusUpdate',
-    'RoomType'
+    'RoomType',
+    'BookingDailyStat',
+    'PricingRule',
+    'PricingRuleType',
+    'LocationPing'
 ]
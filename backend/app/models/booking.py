@@ -1,8 +1,9 @@
 from app import db
-from datetime import datetime
+from datetime import datetime, time as dt_time
+from flask import current_app
 from enum import Enum
-import string
 import random
+import time
 
 class BookingStatus(str, Enum):
     PENDING = 'pending'
@@ -11,8 +12,22 @@ class BookingStatus(str, Enum):
     COMPLETED = 'completed'
     CANCELLED = 'cancelled'
 
+# Monotonic source for booking references: unique without retries and
+# append-only on the booking_reference index
+booking_reference_seq = db.Sequence('booking_reference_seq', metadata=db.metadata)
+
 class Booking(db.Model):
     __tablename__ = 'bookings'
+    __table_args__ = (
+        db.Index('ix_bookings_mover_date_status', 'mover_id', 'scheduled_date', 'status'),
+        db.Index('ix_bookings_client_status_date', 'client_id', 'status', 'scheduled_date'),
+        db.Index('ix_bookings_created_id', 'created_at', 'id'),
+        # Mover dashboard "upcoming jobs": only the small open slice of history
+        db.Index(
+            'ix_bookings_open_mover_schedule', 'mover_id', 'scheduled_date', 'scheduled_time',
+            postgresql_where=db.text("status IN ('CONFIRMED', 'IN_PROGRESS')")
+        ),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     booking_reference = db.Column(db.String(50), unique=True, nullable=False, index=True)
@@ -44,6 +59,7 @@ class Booking(db.Model):
     # Logistics
     distance_km = db.Column(db.Float, nullable=False)
     total_volume = db.Column(db.Float, nullable=False)  # cubic meters
+    items_count = db.Column(db.Integer)  # from the linked inventory, when one is given
     
     # Pricing
     base_price = db.Column(db.Float, nullable=False)
@@ -61,13 +77,18 @@ class Booking(db.Model):
     status_updates = db.relationship('BookingStatusUpdate', backref='booking', lazy='dynamic', 
                                     cascade='all, delete-orphan', order_by='BookingStatusUpdate.created_at')
     review = db.relationship('Review', backref='booking', uselist=False, cascade='all, delete-orphan')
+    slot = db.relationship('MoverSlot', backref='booking', uselist=False, cascade='all, delete-orphan')
     
     @staticmethod
     def generate_reference():
-        """Generate unique booking reference"""
+        """Generate unique booking reference, e.g. BK-2026-000123"""
         year = datetime.utcnow().year
-        random_part = ''.join(random.choices(string.digits, k=3))
-        return f"BK-{year}-{random_part}"
+        if db.engine.dialect.supports_sequences:
+            number = db.session.execute(booking_reference_seq.next_value()).scalar()
+        else:
+            # Databases without sequences (local SQLite tooling): time-ordered id
+            number = int(time.time() * 1000) * 1000 + random.randrange(1000)
+        return f"BK-{year}-{number:06d}"
     
     def to_dict(self, include_client=False, include_mover=False):
         """Convert booking to dictionary"""
@@ -86,6 +107,7 @@ class Booking(db.Model):
             'estimated_duration': self.estimated_duration,
             'distance_km': self.distance_km,
             'total_volume': self.total_volume,
+            'items_count': self.items_count,
             'pricing': {
                 'base_price': self.base_price,
                 'labor_cost': self.labor_cost,
@@ -112,3 +134,71 @@ class Booking(db.Model):
     
     def __repr__(self):
         return f'<Booking {self.booking_reference}>'
+
+
+class MoverSlot(db.Model):
+    """
+    A mover's reserved calendar slot. The unique (mover_id, slot_date,
+    slot_start) key is the lock: a second booking for the same truck and
+    slot fails on insert, however many requests race for it.
+    """
+    __tablename__ = 'mover_slots'
+    __table_args__ = (
+        db.UniqueConstraint('mover_id', 'slot_date', 'slot_start', name='uq_mover_slots_mover_date_start'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    mover_id = db.Column(db.Integer, db.ForeignKey('movers.id'), nullable=False)
+    slot_date = db.Column(db.Date, nullable=False)
+    slot_start = db.Column(db.Time, nullable=False)
+    booking_id = db.Column(db.Integer, db.ForeignKey('bookings.id'), unique=True, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @staticmethod
+    def start_for(scheduled_time):
+        """Start of the slot containing a scheduled time"""
+        minutes = current_app.config.get('BOOKING_SLOT_MINUTES', 240)
+        offset = (scheduled_time.hour * 60 + scheduled_time.minute) // minutes * minutes
+        return dt_time(offset // 60, offset % 60)
+    
+    @staticmethod
+    def day_starts():
+        """All slot start times in a day"""
+        minutes = current_app.config.get('BOOKING_SLOT_MINUTES', 240)
+        return [dt_time(offset // 60, offset % 60) for offset in range(0, 24 * 60, minutes)]
+    
+    @classmethod
+    def for_booking(cls, booking):
+        return cls(
+            mover_id=booking.mover_id,
+            slot_date=booking.scheduled_date,
+            slot_start=cls.start_for(booking.scheduled_time),
+            booking_id=booking.id
+        )
+    
+    @classmethod
+    def rebuild(cls):
+        """
+        Recompute reservations from active bookings, oldest first. Bookings
+        that collide with an earlier one keep no slot; returns (reserved, conflicts).
+        """
+        cls.query.delete(synchronize_session=False)
+        rows = db.session.query(
+            Booking.id, Booking.mover_id, Booking.scheduled_date, Booking.scheduled_time
+        ).filter(
+            Booking.status != BookingStatus.CANCELLED
+        ).order_by(Booking.created_at, Booking.id).all()
+        
+        reserved = {}
+        for row in rows:
+            key = (row.mover_id, row.scheduled_date, cls.start_for(row.scheduled_time))
+            reserved.setdefault(key, row.id)
+        
+        if reserved:
+            db.session.execute(cls.__table__.insert(), [
+                {'mover_id': mover_id, 'slot_date': slot_date, 'slot_start': slot_start,
+                 'booking_id': booking_id, 'created_at': datetime.utcnow()}
+                for (mover_id, slot_date, slot_start), booking_id in reserved.items()
+            ])
+        db.session.commit()
+        return len(reserved), len(rows) - len(reserved)
@@ -1,6 +1,8 @@
 from app import db
 from datetime import datetime
 from enum import Enum
+from sqlalchemy import func, case
+from app.utils.db import upsert
 
 class RoomType(str, Enum):
     BEDSITTER = 'bedsitter'
@@ -32,8 +34,8 @@ class UserInventory(db.Model):
     __tablename__ = 'user_inventories'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    booking_id = db.Column(db.Integer, db.ForeignKey('bookings.id'), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    booking_id = db.Column(db.Integer, db.ForeignKey('bookings.id'), nullable=True, index=True)
     room_type = db.Column(db.Enum(RoomType), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -41,17 +43,96 @@ class UserInventory(db.Model):
     # Relationships
     items = db.relationship('InventoryItem', backref='inventory', lazy='dynamic', cascade='all, delete-orphan')
     
+    def sync_items(self, items_data):
+        """
+        Apply a full item list as a diff: delete rows that disappeared, upsert
+        changed rows and bulk insert new ones. Incoming items match existing
+        rows by id when given, otherwise by item_name.
+        Returns counts of inserted, updated and deleted rows.
+        """
+        existing = {item.id: item for item in self.items.all()}
+        by_name = {}
+        for item in existing.values():
+            by_name.setdefault(item.item_name, []).append(item)
+        
+        matched = set()
+        to_insert = []
+        to_update = []
+        for item_data in items_data:
+            if item_data.get('quantity', 0) <= 0:
+                continue
+            row = InventoryItem.row_from_dict(self.id, item_data)
+            
+            current = existing.get(item_data.get('id'))
+            if current is None or current.id in matched:
+                candidates = [i for i in by_name.get(row['item_name'], []) if i.id not in matched]
+                current = candidates[0] if candidates else None
+            
+            if current is None:
+                to_insert.append(row)
+                continue
+            
+            matched.add(current.id)
+            if any(getattr(current, key) != value for key, value in row.items()):
+                to_update.append(dict(row, id=current.id))
+        
+        to_delete = [item_id for item_id in existing if item_id not in matched]
+        
+        if to_delete:
+            InventoryItem.query.filter(InventoryItem.id.in_(to_delete)).delete(synchronize_session=False)
+        if to_update:
+            InventoryItem.bulk_upsert(to_update)
+        if to_insert:
+            InventoryItem.bulk_insert(to_insert)
+        
+        return {'inserted': len(to_insert), 'updated': len(to_update), 'deleted': len(to_delete)}
+    
     def calculate_total_volume(self):
-        """Calculate total volume from all items"""
-        return sum(item.quantity * item.estimated_volume for item in self.items.all())
+        """Calculate total volume from all items in SQL"""
+        return db.session.query(
+            func.coalesce(func.sum(InventoryItem.quantity * InventoryItem.estimated_volume), 0.0)
+        ).filter(InventoryItem.inventory_id == self.id).scalar()
     
-    def to_dict(self):
+    @classmethod
+    def booking_totals(cls, inventory_id, user_id):
+        """
+        Item count (sum of quantities), total volume and current booking link
+        of a user's inventory in one aggregate query; None if not theirs.
+        """
+        return db.session.query(
+            cls.id,
+            cls.booking_id,
+            func.coalesce(func.sum(InventoryItem.quantity), 0).label('items_count'),
+            func.coalesce(func.sum(InventoryItem.quantity * InventoryItem.estimated_volume), 0.0).label('total_volume')
+        ).outerjoin(
+            InventoryItem, InventoryItem.inventory_id == cls.id
+        ).filter(
+            cls.id == inventory_id,
+            cls.user_id == user_id
+        ).group_by(cls.id, cls.booking_id).first()
+    
+    @classmethod
+    def to_dict_many(cls, inventories):
+        """Serialize inventories, loading the items of all of them in one query"""
+        ids = [inventory.id for inventory in inventories]
+        items_by_inventory = {inventory_id: [] for inventory_id in ids}
+        if ids:
+            items = InventoryItem.query.filter(
+                InventoryItem.inventory_id.in_(ids)
+            ).order_by(InventoryItem.id).all()
+            for item in items:
+                items_by_inventory[item.inventory_id].append(item)
+        return [inventory.to_dict(items=items_by_inventory[inventory.id]) for inventory in inventories]
+    
+    def to_dict(self, items=None):
+        if items is None:
+            items = self.items.order_by(InventoryItem.id).all()
         return {
             'id': self.id,
             'room_type': self.room_type.value,
-            'total_items': self.items.count(),
-            'total_volume': self.calculate_total_volume(),
-            'items': [item.to_dict() for item in self.items.all()],
+            'total_items': len(items),
+            'total_volume': sum(item.quantity * item.estimated_volume for item in items),
+            'items': [item.to_dict() for item in items],
             'created_at': self.created_at.isoformat() if self.created_at else None,
         }
 
@@ -66,6 +147,39 @@ class InventoryItem(db.Model):
     is_custom = db.Column(db.Boolean, default=False)
     notes = db.Column(db.Text)
     
+    @staticmethod
+    def row_from_dict(inventory_id, item_data):
+        """Column values for an item from request data"""
+        return {
+            'inventory_id': inventory_id,
+            'item_name': item_data['item_name'],
+            'quantity': item_data['quantity'],
+            'estimated_volume': item_data.get('estimated_volume', 0.0),
+            'is_custom': item_data.get('is_custom', False),
+            'notes': item_data.get('notes')
+        }
+    
+    @classmethod
+    def bulk_insert(cls, rows):
+        """Insert many items with a single multi-row INSERT"""
+        if rows:
+            db.session.execute(cls.__table__.insert().values(rows))
+    
+    @classmethod
+    def bulk_upsert(cls, rows):
+        """Update many existing items (by id) with a single multi-row upsert"""
+        if not rows:
+            return
+        stmt = upsert(cls.__table__).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['id'],
+            set_={
+                column: stmt.excluded[column]
+                for column in ('item_name', 'quantity', 'estimated_volume', 'is_custom', 'notes')
+            }
+        )
+        db.session.execute(stmt)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -78,6 +192,9 @@ class InventoryItem(db.Model):
 
 class Review(db.Model):
     __tablename__ = 'reviews'
+    __table_args__ = (
+        db.Index('ix_reviews_mover_created', 'mover_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     booking_id = db.Column(db.Integer, db.ForeignKey('bookings.id'), unique=True, nullable=False)
@@ -100,8 +217,43 @@ class Review(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
         }
 
+@db.event.listens_for(Review, 'after_insert')
+def _update_mover_review_stats(mapper, connection, review):
+    """Keep Mover review counters and average rating in step with inserted reviews"""
+    from app.models.mover import Mover
+    
+    movers = Mover.__table__
+    # SET expressions see the old row, so this is a single atomic O(1) update.
+    # NULL counters stay NULL until load_review_stats/reconciliation resolves them.
+    connection.execute(
+        movers.update()
+        .where(movers.c.id == review.mover_id)
+        .values(
+            review_count=movers.c.review_count + 1,
+            rating_sum=movers.c.rating_sum + review.rating,
+            rating=case(
+                (movers.c.review_count.is_(None), movers.c.rating),
+                else_=func.cast(movers.c.rating_sum + review.rating, db.Float) / (movers.c.review_count + 1)
+            )
+        )
+    )
+
+@db.event.listens_for(db.session, 'after_flush')
+def _expire_mover_review_stats(session, flush_context):
+    """The update above bypasses the ORM; reload loaded movers' counters on next access"""
+    from app.models.mover import Mover
+    
+    for review in session.new:
+        if isinstance(review, Review):
+            mover = session.identity_map.get(Mover.__mapper__.identity_key_from_primary_key([review.mover_id]))
+            if mover is not None:
+                session.expire(mover, ['rating', 'review_count', 'rating_sum'])
+
 class BookingStatusUpdate(db.Model):
     __tablename__ = 'booking_status_updates'
+    __table_args__ = (
+        db.Index('ix_booking_status_updates_booking_created', 'booking_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     booking_id = db.Column(db.Integer, db.ForeignKey('bookings.id'), nullable=False)
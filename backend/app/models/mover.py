@@ -1,5 +1,9 @@
 from app import db
 from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm.attributes import set_committed_value, get_history
+from app.models.booking import MoverSlot
+from app.utils.geo import COVERAGE_PRECISION, covering_cells, geohash_encode, haversine_km, home_zone, normalize_zone
 
 class Mover(db.Model):
     __tablename__ = 'movers'
@@ -12,25 +16,160 @@ class Mover(db.Model):
     vehicle_type = db.Column(db.String(100))
     vehicle_capacity = db.Column(db.Float, default=10.0)  # in cubic meters
     coverage_zones = db.Column(db.JSON)  # List of locations
+    base_latitude = db.Column(db.Float)
+    base_longitude = db.Column(db.Float)
+    service_radius_km = db.Column(db.Float, default=30.0)
     base_price_per_km = db.Column(db.Float, default=100.0)
     price_per_cubic_meter = db.Column(db.Float, default=500.0)
     is_approved = db.Column(db.Boolean, default=False)
     is_available = db.Column(db.Boolean, default=True)
     rating = db.Column(db.Float, default=0.0)
     total_jobs_completed = db.Column(db.Integer, default=0)
+    # Maintained on review insert; NULL means not yet computed (see load_review_stats)
+    review_count = db.Column(db.Integer, default=0)
+    rating_sum = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     bookings = db.relationship('Booking', foreign_keys='Booking.mover_id', backref='mover', lazy='dynamic')
     reviews = db.relationship('Review', foreign_keys='Review.mover_id', backref='reviewed_mover', lazy='dynamic')
+    coverage_cells = db.relationship('MoverCoverageCell', backref='mover', lazy='dynamic', cascade='all, delete-orphan')
+    zones = db.relationship('MoverZone', backref='mover', lazy='dynamic', cascade='all, delete-orphan')
     
     def calculate_rating(self):
-        """Calculate average rating from reviews"""
-        reviews = self.reviews.all()
-        if not reviews:
+        """Calculate average rating from the running review sum and count"""
+        if self.review_count is None or self.rating_sum is None:
+            Mover.load_review_stats([self])
+        if not self.review_count:
             return 0.0
-        return sum(review.rating for review in reviews) / len(reviews)
+        return self.rating_sum / self.review_count
+    
+    @classmethod
+    def reconcile_review_stats(cls):
+        """Recompute review_count, rating_sum and rating for all movers from reviews"""
+        from app.models.inventory import Review
+        
+        movers = cls.__table__
+        totals = db.session.query(
+            Review.mover_id.label('mover_id'),
+            func.count(Review.id).label('review_count'),
+            func.sum(Review.rating).label('rating_sum')
+        ).group_by(Review.mover_id).subquery()
+        
+        updated = db.session.execute(
+            movers.update()
+            .where(movers.c.id == totals.c.mover_id)
+            .values(
+                review_count=totals.c.review_count,
+                rating_sum=totals.c.rating_sum,
+                rating=func.cast(totals.c.rating_sum, db.Float) / totals.c.review_count
+            )
+        ).rowcount
+        
+        # Movers without any reviews
+        db.session.execute(
+            movers.update()
+            .where(~movers.c.id.in_(db.session.query(Review.mover_id).distinct()))
+            .values(review_count=0, rating_sum=0, rating=0.0)
+        )
+        db.session.commit()
+        return updated
+    
+    @classmethod
+    def load_review_stats(cls, movers):
+        """Fill in missing review_count/rating_sum for many movers with one grouped query"""
+        from app.models.inventory import Review
+        
+        missing = {mover.id: mover for mover in movers if mover.review_count is None or mover.rating_sum is None}
+        if not missing:
+            return
+        
+        rows = db.session.query(
+            Review.mover_id,
+            func.count(Review.id),
+            func.coalesce(func.sum(Review.rating), 0)
+        ).filter(Review.mover_id.in_(missing.keys())).group_by(Review.mover_id).all()
+        counts = {mover_id: (count, total) for mover_id, count, total in rows}
+        
+        for mover_id, mover in missing.items():
+            count, total = counts.get(mover_id, (0, 0))
+            # Populate without marking the row dirty
+            set_committed_value(mover, 'review_count', count)
+            set_committed_value(mover, 'rating_sum', int(total))
+    
+    @classmethod
+    def to_dict_many(cls, movers, include_user=False):
+        """Serialize a list of movers without per-row COUNT queries"""
+        cls.load_review_stats(movers)
+        return [mover.to_dict(include_user=include_user) for mover in movers]
+    
+    def refresh_coverage_cells(self):
+        """Rebuild the geohash cells covering this mover's service area"""
+        MoverCoverageCell.query.filter_by(mover_id=self.id).delete(synchronize_session=False)
+        if self.base_latitude is None or self.base_longitude is None:
+            return 0
+        
+        cells = covering_cells(self.base_latitude, self.base_longitude, self.service_radius_km or 0.0)
+        if cells:
+            db.session.execute(
+                MoverCoverageCell.__table__.insert().values([
+                    {'mover_id': self.id, 'geohash': cell} for cell in sorted(cells)
+                ])
+            )
+        return len(cells)
+    
+    @classmethod
+    def covering_point(cls, latitude, longitude, query=None):
+        """
+        Movers whose service area contains the point, nearest first.
+        Candidates come from an index lookup on the point's geohash cell;
+        the exact radius check and ordering use great-circle distance.
+        Returns a list of (mover, distance_km).
+        """
+        cell = geohash_encode(latitude, longitude, COVERAGE_PRECISION)
+        query = (query if query is not None else cls.query).join(
+            MoverCoverageCell, MoverCoverageCell.mover_id == cls.id
+        ).filter(MoverCoverageCell.geohash == cell)
+        
+        matches = []
+        for mover in query.all():
+            distance = haversine_km(latitude, longitude, mover.base_latitude, mover.base_longitude)
+            if distance <= (mover.service_radius_km or 0.0):
+                matches.append((mover, distance))
+        matches.sort(key=lambda match: match[1])
+        return matches
+    
+    @classmethod
+    def available_for(cls, slot_date, scheduled_time, volume=None, query=None):
+        """Filter to movers with the slot free (and room for volume, if given)"""
+        query = query if query is not None else cls.query
+        taken = db.session.query(MoverSlot.id).filter(
+            MoverSlot.mover_id == cls.id,
+            MoverSlot.slot_date == slot_date,
+            MoverSlot.slot_start == MoverSlot.start_for(scheduled_time)
+        ).exists()
+        query = query.filter(~taken)
+        if volume is not None:
+            query = query.filter(cls.vehicle_capacity >= volume)
+        return query
+    
+    @classmethod
+    def in_zones(cls, zones, query=None):
+        """Filter to movers covering every given zone (case-insensitive)"""
+        zones = {normalize_zone(zone) for zone in zones} - {None}
+        query = query if query is not None else cls.query
+        if not zones:
+            return query
+        matching = db.session.query(MoverZone.mover_id).filter(
+            MoverZone.zone.in_(zones)
+        ).group_by(MoverZone.mover_id).having(func.count(MoverZone.zone) == len(zones))
+        return query.filter(cls.id.in_(matching))
+    
+    @property
+    def pricing_zone(self):
+        """Zone whose pricing rules apply to this mover's jobs (its home zone)"""
+        return home_zone(self.coverage_zones)
     
     def to_dict(self, include_user=False):
         """Convert mover to dictionary"""
@@ -41,13 +180,16 @@ class Mover(db.Model):
             'vehicle_type': self.vehicle_type,
             'vehicle_capacity': self.vehicle_capacity,
             'coverage_zones': self.coverage_zones,
+            'base_latitude': self.base_latitude,
+            'base_longitude': self.base_longitude,
+            'service_radius_km': self.service_radius_km,
             'base_price_per_km': self.base_price_per_km,
             'price_per_cubic_meter': self.price_per_cubic_meter,
             'is_approved': self.is_approved,
             'is_available': self.is_available,
             'rating': round(self.rating, 1),
             'total_jobs_completed': self.total_jobs_completed,
-            'review_count': self.reviews.count(),
+            'review_count': self.review_count if self.review_count is not None else self.reviews.count(),
             'created_at': self.created_at.isoformat() if self.created_at else None,
         }
         
@@ -60,3 +202,44 @@ class Mover(db.Model):
     
     def __repr__(self):
         return f'<Mover {self.company_name}>'
+
+
+class MoverCoverageCell(db.Model):
+    """Geohash cell (at COVERAGE_PRECISION) inside a mover's service area"""
+    __tablename__ = 'mover_coverage_cells'
+    __table_args__ = (
+        db.UniqueConstraint('geohash', 'mover_id', name='uq_mover_coverage_cells_geohash_mover'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    mover_id = db.Column(db.Integer, db.ForeignKey('movers.id'), nullable=False, index=True)
+    geohash = db.Column(db.String(12), nullable=False)
+
+
+class MoverZone(db.Model):
+    """Normalized, indexed copy of Mover.coverage_zones (one row per zone)"""
+    __tablename__ = 'mover_zones'
+    __table_args__ = (
+        db.UniqueConstraint('zone', 'mover_id', name='uq_mover_zones_zone_mover'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    mover_id = db.Column(db.Integer, db.ForeignKey('movers.id'), nullable=False, index=True)
+    zone = db.Column(db.String(100), nullable=False)  # lower-case
+
+def sync_mover_zones(connection, mover):
+    """Rewrite a mover's mover_zones rows from coverage_zones"""
+    table = MoverZone.__table__
+    connection.execute(table.delete().where(table.c.mover_id == mover.id))
+    zones = sorted({normalize_zone(zone) for zone in (mover.coverage_zones or []) if isinstance(zone, str)} - {None})
+    if zones:
+        connection.execute(table.insert(), [{'mover_id': mover.id, 'zone': zone} for zone in zones])
+
+@db.event.listens_for(Mover, 'after_insert')
+def _zones_on_insert(mapper, connection, mover):
+    sync_mover_zones(connection, mover)
+
+@db.event.listens_for(Mover, 'after_update')
+def _zones_on_update(mapper, connection, mover):
+    if get_history(mover, 'coverage_zones').has_changes():
+        sync_mover_zones(connection, mover)
@@ -0,0 +1,43 @@
+from app import db
+from datetime import datetime
+from enum import Enum
+
+class PricingRuleType(str, Enum):
+    LABOR_TIER = 'labor_tier'      # value = labor cost for volumes up to max_volume
+    PACKING_RATE = 'packing_rate'  # value = packing cost per cubic meter
+    SERVICE_FEE = 'service_fee'    # value = flat fee, or percent of subtotal if is_percentage
+
+class PricingRule(db.Model):
+    """
+    Data-driven pricing rule. mover_id and zone scope a rule; NULL means
+    it applies to every mover / zone. The most specific scope wins:
+    mover+zone, then mover, then zone, then global.
+    """
+    __tablename__ = 'pricing_rules'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    rule_type = db.Column(db.Enum(PricingRuleType), nullable=False)
+    mover_id = db.Column(db.Integer, db.ForeignKey('movers.id'), nullable=True, index=True)
+    zone = db.Column(db.String(100), nullable=True)  # stored lower-case
+    max_volume = db.Column(db.Float, nullable=True)  # labor tiers only; NULL = no upper bound
+    value = db.Column(db.Float, nullable=False)
+    is_percentage = db.Column(db.Boolean, default=False)
+    is_active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'rule_type': self.rule_type.value,
+            'mover_id': self.mover_id,
+            'zone': self.zone,
+            'max_volume': self.max_volume,
+            'value': self.value,
+            'is_percentage': self.is_percentage,
+            'is_active': self.is_active,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
+    
+    def __repr__(self):
+        return f'<PricingRule {self.rule_type.value} mover={self.mover_id} zone={self.zone}>'
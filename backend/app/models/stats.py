@@ -0,0 +1,79 @@
+from app import db
+from app.models.booking import Booking, BookingStatus
+from app.utils.db import upsert
+from datetime import datetime
+from sqlalchemy import func
+
+class BookingDailyStat(db.Model):
+    """Per-day, per-mover, per-status booking rollup kept in step with bookings"""
+    __tablename__ = 'booking_daily_stats'
+    __table_args__ = (
+        db.UniqueConstraint('mover_id', 'day', 'status', name='uq_booking_daily_stats_mover_day_status'),
+        db.Index('ix_booking_daily_stats_day_status', 'day', 'status'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)  # booking scheduled_date
+    mover_id = db.Column(db.Integer, db.ForeignKey('movers.id'), nullable=False)
+    status = db.Column(db.Enum(BookingStatus), nullable=False)
+    booking_count = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    @classmethod
+    def record(cls, day, mover_id, status, count_delta=1, revenue_delta=0.0):
+        """Atomically add deltas to a rollup row in the current transaction"""
+        stmt = upsert(cls.__table__).values(
+            day=day,
+            mover_id=mover_id,
+            status=status,
+            booking_count=count_delta,
+            revenue=revenue_delta,
+            updated_at=datetime.utcnow()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['mover_id', 'day', 'status'],
+            set_={
+                'booking_count': cls.__table__.c.booking_count + stmt.excluded.booking_count,
+                'revenue': cls.__table__.c.revenue + stmt.excluded.revenue,
+                'updated_at': stmt.excluded.updated_at
+            }
+        )
+        db.session.execute(stmt)
+    
+    @classmethod
+    def record_booking(cls, booking):
+        """Count a newly created booking"""
+        cls.record(booking.scheduled_date, booking.mover_id, booking.status, 1, booking.total_price)
+    
+    @classmethod
+    def record_status_change(cls, booking, old_status):
+        """Move a booking from its old status bucket to its current one"""
+        if old_status == booking.status:
+            return
+        cls.record(booking.scheduled_date, booking.mover_id, old_status, -1, -booking.total_price)
+        cls.record(booking.scheduled_date, booking.mover_id, booking.status, 1, booking.total_price)
+    
+    @classmethod
+    def rebuild(cls):
+        """Recompute the whole rollup from the bookings table"""
+        db.session.execute(cls.__table__.delete())
+        source = db.session.query(
+            Booking.scheduled_date,
+            Booking.mover_id,
+            Booking.status,
+            func.count(Booking.id),
+            func.coalesce(func.sum(Booking.total_price), 0),
+            func.now()
+        ).group_by(Booking.scheduled_date, Booking.mover_id, Booking.status)
+        db.session.execute(
+            cls.__table__.insert().from_select(
+                ['day', 'mover_id', 'status', 'booking_count', 'revenue', 'updated_at'],
+                source
+            )
+        )
+        db.session.commit()
+        return cls.query.count()
+    
+    def __repr__(self):
+        return f'<BookingDailyStat {self.day} mover={self.mover_id} {self.status.value}>'
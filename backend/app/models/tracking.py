@@ -0,0 +1,96 @@
+from app import db
+from app.utils.db import upsert
+from datetime import date, datetime, timedelta
+from sqlalchemy import text
+
+class LocationPing(db.Model):
+    """
+    Append-only GPS pings from mover devices. On PostgreSQL the table is
+    range-partitioned by month on recorded_at, with a DEFAULT partition
+    for months not created yet (see ensure_partitions).
+    The primary key makes re-sent pings a no-op.
+    """
+    __tablename__ = 'location_pings'
+    __table_args__ = {'postgresql_partition_by': 'RANGE (recorded_at)'}
+    
+    booking_id = db.Column(db.Integer, db.ForeignKey('bookings.id'), primary_key=True)
+    recorded_at = db.Column(db.DateTime, primary_key=True)  # device clock (UTC)
+    mover_id = db.Column(db.Integer, db.ForeignKey('movers.id'), nullable=False)
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+    accuracy_m = db.Column(db.Float)
+    speed_kmh = db.Column(db.Float)
+    heading = db.Column(db.Float)
+    received_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @classmethod
+    def insert_many(cls, rows):
+        """Append pings with one multi-row INSERT, skipping duplicates"""
+        if not rows:
+            return
+        stmt = upsert(cls.__table__).values(rows).on_conflict_do_nothing(
+            index_elements=['booking_id', 'recorded_at']
+        )
+        db.session.execute(stmt)
+        db.session.commit()
+    
+    @classmethod
+    def latest_for(cls, booking_id):
+        """Most recent stored ping for a booking"""
+        return cls.query.filter_by(booking_id=booking_id).order_by(cls.recorded_at.desc()).first()
+    
+    @staticmethod
+    def ensure_partitions(months_ahead=2, start=None):
+        """
+        Create monthly partitions from start's month through months_ahead
+        months later, plus a DEFAULT partition that catches pings outside
+        them (PostgreSQL only). Rows already parked in the default partition
+        for a new month are moved into it. Returns the partition names created.
+        """
+        if db.engine.dialect.name != 'postgresql':
+            return []
+        
+        created = []
+        if db.session.execute(text("SELECT to_regclass('location_pings_default')")).scalar() is None:
+            db.session.execute(text('CREATE TABLE location_pings_default PARTITION OF location_pings DEFAULT'))
+            created.append('location_pings_default')
+        
+        # Start from yesterday so late pings at the turn of a month have a home
+        start = start or date.today() - timedelta(days=1)
+        year, month = start.year, start.month
+        for _ in range(months_ahead + 1):
+            next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+            name = f'location_pings_{year}_{month:02d}'
+            exists = db.session.execute(text('SELECT to_regclass(:name)'), {'name': name}).scalar()
+            if exists is None:
+                bounds = {'lower': date(year, month, 1), 'upper': date(next_year, next_month, 1)}
+                # A new range may not overlap rows held by the default partition
+                db.session.execute(text(
+                    'CREATE TEMP TABLE parked_pings (LIKE location_pings) ON COMMIT DROP'
+                ))
+                db.session.execute(text(
+                    'WITH moved AS ('
+                    '  DELETE FROM location_pings_default'
+                    '  WHERE recorded_at >= :lower AND recorded_at < :upper RETURNING *'
+                    ') INSERT INTO parked_pings SELECT * FROM moved'
+                ), bounds)
+                db.session.execute(text(
+                    f"CREATE TABLE {name} PARTITION OF location_pings "
+                    f"FOR VALUES FROM ('{bounds['lower']}') TO ('{bounds['upper']}')"
+                ))
+                db.session.execute(text('INSERT INTO location_pings SELECT * FROM parked_pings'))
+                db.session.execute(text('DROP TABLE parked_pings'))
+                created.append(name)
+            year, month = next_year, next_month
+        db.session.commit()
+        return created
+    
+    def to_dict(self):
+        return {
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'accuracy_m': self.accuracy_m,
+            'speed_kmh': self.speed_kmh,
+            'heading': self.heading,
+            'recorded_at': self.recorded_at.isoformat() if self.recorded_at else None,
+        }
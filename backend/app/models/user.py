@@ -1,4 +1,6 @@
-from app import db, bcrypt
+from app import db
+from app.utils.hashing import hash_password, verify_password, hash_cost
+from flask import current_app
 from datetime import datetime
 from enum import Enum
 
@@ -18,6 +20,7 @@ class User(db.Model):
     role = db.Column(db.Enum(UserRole), nullable=False, default=UserRole.CLIENT)
     is_active = db.Column(db.Boolean, default=True)
     is_verified = db.Column(db.Boolean, default=False)
+    token_version = db.Column(db.Integer, nullable=False, default=0)  # bump to revoke issued tokens
     profile_image_url = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -30,11 +33,19 @@ class User(db.Model):
     
     def set_password(self, password):
         """Hash and set password"""
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
         """Check if password matches hash"""
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        """True if the stored hash was made with a different work factor"""
+        return hash_cost(self.password_hash) != current_app.config['BCRYPT_LOG_ROUNDS']
+    
+    def revoke_tokens(self):
+        """Invalidate every access token issued so far"""
+        self.token_version = (self.token_version or 0) + 1
     
     def to_dict(self):
         """Convert user to dictionary"""
@@ -58,3 +69,10 @@ class User(db.Model):
     
     def __repr__(self):
         return f'<User {self.email} - {self.role.value}>'
+
+@db.event.listens_for(User.role, 'set')
+@db.event.listens_for(User.is_active, 'set')
+def _revoke_on_access_change(user, value, old_value, initiator):
+    """Tokens embed role and active state, so changing either revokes them"""
+    if user.id is not None and value != old_value:
+        user.revoke_tokens()
@@ -1,78 +1,136 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, Response, stream_with_context, current_app
 from flask_jwt_extended import jwt_required
 from app import db
 from app.utils.decorators import role_required, get_current_user
-from app.models import User, Mover, Booking, BookingStatus, UserRole
-from datetime import datetime
-from sqlalchemy import func, extract
+from app.utils.pagination import get_page_size, keyset_page, MAX_PAGE_SIZE
+from app.utils.cache import TTLCache
+from app.utils.hashing import hash_pool
+from app.utils.events import get_broker
+from app.utils.tracking import ping_buffer
+from app.utils.distance import distance_engine
+from app.utils.geo import normalize_zone
+from app.utils.serializers import serialize, dumps_bytes
+from app.models import User, Mover, Booking, BookingStatus, UserRole, BookingDailyStat, PricingRule, PricingRuleType
+from datetime import datetime, timedelta
+from sqlalchemy import func, case, and_, true
+from sqlalchemy.orm import joinedload
 
 bp = Blueprint('admin', __name__)
 
+# Dashboard responses keyed by calendar day (which also fixes the month)
+dashboard_cache = TTLCache()
+
+def _period_bounds(now):
+    """Half-open datetime ranges for today, this month and last month"""
+    today = datetime(now.year, now.month, now.day)
+    month_start = today.replace(day=1)
+    if month_start.month == 12:
+        next_month_start = month_start.replace(year=month_start.year + 1, month=1)
+    else:
+        next_month_start = month_start.replace(month=month_start.month + 1)
+    last_month_start = (month_start - timedelta(days=1)).replace(day=1)
+    
+    return {
+        'today': today,
+        'tomorrow': today + timedelta(days=1),
+        'month_start': month_start,
+        'next_month_start': next_month_start,
+        'last_month_start': last_month_start
+    }
+
+def _in_range(column, start, end):
+    """Sargable half-open range predicate"""
+    return and_(column >= start, column < end)
+
+def _count_if(condition):
+    return func.count(case((condition, 1)))
+
+def _sum_if(condition, value):
+    return func.coalesce(func.sum(case((condition, value), else_=0)), 0)
+
+def _dashboard_aggregates(bounds):
+    """Compute every dashboard counter in a single round-trip"""
+    completed = BookingDailyStat.status == BookingStatus.COMPLETED
+    month = _in_range(BookingDailyStat.day, bounds['month_start'].date(), bounds['next_month_start'].date())
+    last_month = _in_range(BookingDailyStat.day, bounds['last_month_start'].date(), bounds['month_start'].date())
+    
+    users = db.session.query(
+        func.count(User.id).label('total_users'),
+        _count_if(_in_range(User.created_at, bounds['last_month_start'], bounds['month_start'])).label('last_month_users'),
+        _count_if(_in_range(User.created_at, bounds['today'], bounds['tomorrow'])).label('new_users_today')
+    ).subquery()
+    
+    # Booking totals come from the daily rollup, so cost grows with days, not bookings
+    bookings = db.session.query(
+        func.coalesce(func.sum(BookingDailyStat.booking_count), 0).label('total_bookings'),
+        _sum_if(completed, BookingDailyStat.booking_count).label('completed'),
+        _sum_if(and_(completed, month), BookingDailyStat.revenue).label('revenue'),
+        _sum_if(and_(completed, last_month), BookingDailyStat.revenue).label('last_month_revenue'),
+        _sum_if(and_(
+            BookingDailyStat.day == bounds['today'].date(),
+            BookingDailyStat.status.in_([BookingStatus.CONFIRMED, BookingStatus.IN_PROGRESS])
+        ), BookingDailyStat.booking_count).label('active_today')
+    ).subquery()
+    
+    # Growth is measured on creation time, which the rollup does not track
+    new_bookings = db.session.query(
+        func.count(Booking.id).label('last_month_bookings')
+    ).filter(
+        _in_range(Booking.created_at, bounds['last_month_start'], bounds['month_start'])
+    ).subquery()
+    
+    movers = db.session.query(
+        _count_if(and_(Mover.is_approved.is_(True), Mover.is_available.is_(True))).label('active_movers'),
+        _count_if(_in_range(Mover.created_at, bounds['month_start'], bounds['next_month_start'])).label('new_movers'),
+        func.avg(Mover.rating).label('avg_rating')
+    ).subquery()
+    
+    # Each subquery yields exactly one row, so cross-joining them is intended
+    return db.session.query(users, bookings, new_bookings, movers).select_from(users) \
+        .join(bookings, true()).join(new_bookings, true()).join(movers, true()) \
+        .one()._asdict()
+
+def _format_growth(value):
+    return f'+{value}%' if value > 0 else f'{value}%'
+
 @bp.route('/dashboard', methods=['GET'])
 @jwt_required()
 @role_required(['admin'])
 def get_dashboard():
     """Get admin dashboard statistics"""
     try:
-        current_month = datetime.utcnow().month
-        current_year = datetime.utcnow().year
-        last_month = current_month - 1 if current_month > 1 else 12
-        
-        # Total users
-        total_users = User.query.count()
-        last_month_users = User.query.filter(
-            extract('month', User.created_at) == last_month
-        ).count()
-        user_growth = round((total_users - last_month_users) / max(last_month_users, 1) * 100)
-        
-        # Active movers
-        active_movers = Mover.query.filter_by(is_approved=True, is_available=True).count()
+        now = datetime.utcnow()
+        cache_key = now.date().isoformat()
+        data = dashboard_cache.get(cache_key)
+        if data is not None:
+            return jsonify(data), 200
         
-        # Total bookings
-        total_bookings = Booking.query.count()
-        last_month_bookings = Booking.query.filter(
-            extract('month', Booking.created_at) == last_month
-        ).count()
-        booking_growth = round((total_bookings - last_month_bookings) / max(last_month_bookings, 1) * 100)
+        bounds = _period_bounds(now)
+        stats = _dashboard_aggregates(bounds)
         
-        # Revenue this month
-        revenue = db.session.query(func.sum(Booking.total_price)).filter(
-            Booking.status == BookingStatus.COMPLETED,
-            extract('month', Booking.scheduled_date) == current_month,
-            extract('year', Booking.scheduled_date) == current_year
-        ).scalar() or 0
+        total_users = stats['total_users']
+        last_month_users = stats['last_month_users']
+        user_growth = round((total_users - last_month_users) / max(last_month_users, 1) * 100)
         
-        last_month_revenue = db.session.query(func.sum(Booking.total_price)).filter(
-            Booking.status == BookingStatus.COMPLETED,
-            extract('month', Booking.scheduled_date) == last_month
-        ).scalar() or 1
+        total_bookings = stats['total_bookings']
+        last_month_bookings = stats['last_month_bookings']
+        booking_growth = round((total_bookings - last_month_bookings) / max(last_month_bookings, 1) * 100)
         
+        revenue = stats['revenue'] or 0
+        last_month_revenue = stats['last_month_revenue'] or 1
         revenue_growth = round((revenue - last_month_revenue) / last_month_revenue * 100)
         
+        completion_rate = round(stats['completed'] / max(total_bookings, 1) * 100)
+        avg_rating = stats['avg_rating'] or 0
+        
         # Pending mover approvals
-        pending_movers = Mover.query.filter_by(is_approved=False).all()
+        pending_movers = Mover.query.options(joinedload(Mover.user)).filter_by(is_approved=False).all()
         
         # Recent bookings
-        recent_bookings = Booking.query.order_by(
-            Booking.created_at.desc()
-        ).limit(10).all()
-        
-        # Quick stats
-        active_today = Booking.query.filter(
-            Booking.scheduled_date == datetime.utcnow().date(),
-            Booking.status.in_([BookingStatus.CONFIRMED, BookingStatus.IN_PROGRESS])
-        ).count()
-        
-        new_users_today = User.query.filter(
-            func.date(User.created_at) == datetime.utcnow().date()
-        ).count()
-        
-        # Completion rate
-        completed = Booking.query.filter_by(status=BookingStatus.COMPLETED).count()
-        completion_rate = round(completed / max(total_bookings, 1) * 100)
-        
-        # Average rating across all movers
-        avg_rating = db.session.query(func.avg(Mover.rating)).scalar() or 0
+        recent_bookings = Booking.query.options(
+            joinedload(Booking.client),
+            joinedload(Booking.mover)
+        ).order_by(Booking.created_at.desc()).limit(10).all()
         
         # Top movers
         top_movers = Mover.query.filter_by(is_approved=True).order_by(
@@ -82,14 +140,14 @@ def get_dashboard():
         data = {
             'stats': {
                 'total_users': total_users,
-                'active_movers': active_movers,
+                'active_movers': stats['active_movers'],
                 'total_bookings': total_bookings,
                 'revenue_this_month': round(revenue, 2),
                 'growth': {
-                    'users': f'+{user_growth}%' if user_growth > 0 else f'{user_growth}%',
-                    'movers': f'+{Mover.query.filter(extract("month", Mover.created_at) == current_month).count()}',
-                    'bookings': f'+{booking_growth}%' if booking_growth > 0 else f'{booking_growth}%',
-                    'revenue': f'+{revenue_growth}%' if revenue_growth > 0 else f'{revenue_growth}%'
+                    'users': _format_growth(user_growth),
+                    'movers': f"+{stats['new_movers']}",
+                    'bookings': _format_growth(booking_growth),
+                    'revenue': _format_growth(revenue_growth)
                 }
             },
             'pending_movers': [
@@ -97,7 +155,7 @@ def get_dashboard():
                     'id': mover.id,
                     'company_name': mover.company_name,
                     'email': mover.user.email if mover.user else None,
-                    'registration_number': mover.registration_number or f'REG-{current_year}-{str(mover.id).zfill(3)}',
+                    'registration_number': mover.registration_number or f'REG-{now.year}-{str(mover.id).zfill(3)}',
                     'applied_on': mover.created_at.strftime('%b %d, %Y') if mover.created_at else None,
                     'coverage_zone': ', '.join(mover.coverage_zones) if mover.coverage_zones else 'Not specified'
                 }
@@ -119,8 +177,8 @@ def get_dashboard():
                 'pending_reviews': 12  # Mock value
             },
             'quick_stats': {
-                'active_bookings_today': active_today,
-                'new_users_today': new_users_today,
+                'active_bookings_today': stats['active_today'],
+                'new_users_today': stats['new_users_today'],
                 'completion_rate': completion_rate,
                 'average_rating': round(avg_rating, 1)
             },
@@ -135,6 +193,8 @@ def get_dashboard():
             ]
         }
         
+        dashboard_cache.set(cache_key, data, ttl=current_app.config['ADMIN_DASHBOARD_CACHE_TTL'])
+        
         return jsonify(data), 200
         
     except Exception as e:
@@ -146,9 +206,9 @@ def get_dashboard():
 def get_pending_movers():
     """Get all pending mover approvals"""
     try:
-        movers = Mover.query.filter_by(is_approved=False).all()
+        movers = Mover.query.options(joinedload(Mover.user)).filter_by(is_approved=False).all()
         return jsonify({
-            'movers': [mover.to_dict(include_user=True) for mover in movers]
+            'movers': Mover.to_dict_many(movers, include_user=True)
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -166,6 +226,7 @@ def approve_mover(mover_id):
         mover.is_approved = True
         mover.is_available = True
         db.session.commit()
+        dashboard_cache.clear()
         
         return jsonify({
             'message': 'Mover approved successfully',
@@ -191,6 +252,7 @@ def reject_mover(mover_id):
         if user:
             db.session.delete(user)
         db.session.commit()
+        dashboard_cache.clear()
         
         return jsonify({'message': 'Mover rejected and removed'}), 200
     except Exception as e:
@@ -203,9 +265,9 @@ def reject_mover(mover_id):
 def get_users():
     """Get all users"""
     try:
-        users = User.query.all()
+        users = User.query.options(joinedload(User.mover_profile)).all()
         return jsonify({
-            'users': [user.to_dict() for user in users],
+            'users': serialize('user', users),
             'total': len(users)
         }), 200
     except Exception as e:
@@ -215,12 +277,186 @@ def get_users():
 @jwt_required()
 @role_required(['admin'])
 def get_all_bookings():
-    """Get all bookings"""
+    """
+    Get all bookings, newest first, using keyset pagination.
+    Query params: limit (capped), cursor (from next_cursor),
+    format=ndjson to stream every booking as newline-delimited JSON.
+    """
     try:
-        bookings = Booking.query.order_by(Booking.created_at.desc()).all()
+        if request.args.get('format') == 'ndjson':
+            return Response(
+                stream_with_context(_stream_bookings()),
+                mimetype='application/x-ndjson'
+            )
+        
+        try:
+            limit = get_page_size(request.args.get('limit'))
+            bookings, next_cursor = keyset_page(
+                _bookings_query(),
+                Booking.created_at,
+                Booking.id,
+                cursor=request.args.get('cursor'),
+                limit=limit
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        _load_mover_review_stats(bookings)
+        
         return jsonify({
-            'bookings': [booking.to_dict(include_client=True, include_mover=True) for booking in bookings],
-            'total': len(bookings)
+            'bookings': serialize('booking.admin', bookings),
+            'total': len(bookings),
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+def _bookings_query():
+    """Booking query with client, mover and mover user eager loaded"""
+    return Booking.query.options(
+        joinedload(Booking.client),
+        joinedload(Booking.mover).joinedload(Mover.user)
+    )
+
+def _load_mover_review_stats(bookings):
+    """Resolve review counts for every mover on the page in one query"""
+    Mover.load_review_stats({booking.mover for booking in bookings if booking.mover})
+
+def _stream_bookings():
+    """Yield every booking as NDJSON, one keyset page at a time"""
+    cursor = None
+    while True:
+        bookings, cursor = keyset_page(
+            _bookings_query(),
+            Booking.created_at,
+            Booking.id,
+            cursor=cursor,
+            limit=MAX_PAGE_SIZE
+        )
+        _load_mover_review_stats(bookings)
+        for booking in bookings:
+            yield dumps_bytes(serialize('booking.admin', booking)) + b'\n'
+            # Keep the identity map flat across pages
+            db.session.expunge(booking)
+        if cursor is None:
+            break
+
+@bp.route('/metrics/hashing', methods=['GET'])
+@jwt_required()
+@role_required(['admin'])
+def get_hashing_metrics():
+    """Get password hashing pool counters for this worker"""
+    return jsonify({'hashing': hash_pool.stats()}), 200
+
+@bp.route('/metrics/tracking', methods=['GET'])
+@jwt_required()
+@role_required(['admin'])
+def get_tracking_metrics():
+    """Get GPS ping buffer and tracking broker counters for this worker"""
+    return jsonify({'pings': ping_buffer.stats(), 'broker': get_broker().stats()}), 200
+
+@bp.route('/metrics/distance', methods=['GET'])
+@jwt_required()
+@role_required(['admin'])
+def get_distance_metrics():
+    """Get distance cache counters for this worker"""
+    return jsonify({'distance': distance_engine.stats()}), 200
+
+def _apply_pricing_rule_fields(rule, data):
+    """Validate request data and copy it onto a pricing rule"""
+    if 'rule_type' in data:
+        rule.rule_type = PricingRuleType(data['rule_type'])
+    if 'value' in data:
+        rule.value = float(data['value'])
+    if 'mover_id' in data:
+        if data['mover_id'] is not None and not Mover.query.get(data['mover_id']):
+            raise ValueError('Mover not found')
+        rule.mover_id = data['mover_id']
+    if 'zone' in data:
+        rule.zone = normalize_zone(data['zone'])
+    if 'max_volume' in data:
+        rule.max_volume = float(data['max_volume']) if data['max_volume'] is not None else None
+    if 'is_percentage' in data:
+        rule.is_percentage = bool(data['is_percentage'])
+    if 'is_active' in data:
+        rule.is_active = bool(data['is_active'])
+    
+    if rule.rule_type is None or rule.value is None:
+        raise ValueError('rule_type and value are required')
+    if rule.max_volume is not None and rule.rule_type != PricingRuleType.LABOR_TIER:
+        raise ValueError('max_volume only applies to labor_tier rules')
+
+@bp.route('/pricing-rules', methods=['GET'])
+@jwt_required()
+@role_required(['admin'])
+def get_pricing_rules():
+    """Get all pricing rules"""
+    try:
+        rules = PricingRule.query.order_by(
+            PricingRule.rule_type, PricingRule.mover_id, PricingRule.zone, PricingRule.max_volume
+        ).all()
+        return jsonify({'rules': [rule.to_dict() for rule in rules]}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/pricing-rules', methods=['POST'])
+@jwt_required()
+@role_required(['admin'])
+def create_pricing_rule():
+    """Create a pricing rule (takes effect without a deploy)"""
+    try:
+        rule = PricingRule()
+        try:
+            _apply_pricing_rule_fields(rule, request.get_json() or {})
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+        
+        db.session.add(rule)
+        db.session.commit()
+        
+        return jsonify({'message': 'Pricing rule created', 'rule': rule.to_dict()}), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/pricing-rules/<int:rule_id>', methods=['PUT'])
+@jwt_required()
+@role_required(['admin'])
+def update_pricing_rule(rule_id):
+    """Update a pricing rule"""
+    try:
+        rule = PricingRule.query.get(rule_id)
+        if not rule:
+            return jsonify({'error': 'Pricing rule not found'}), 404
+        
+        try:
+            _apply_pricing_rule_fields(rule, request.get_json() or {})
+        except (TypeError, ValueError) as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 400
+        
+        db.session.commit()
+        
+        return jsonify({'message': 'Pricing rule updated', 'rule': rule.to_dict()}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/pricing-rules/<int:rule_id>', methods=['DELETE'])
+@jwt_required()
+@role_required(['admin'])
+def delete_pricing_rule(rule_id):
+    """Delete a pricing rule"""
+    try:
+        rule = PricingRule.query.get(rule_id)
+        if not rule:
+            return jsonify({'error': 'Pricing rule not found'}), 404
+        
+        db.session.delete(rule)
+        db.session.commit()
+        
+        return jsonify({'message': 'Pricing rule deleted'}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
@@ -1,7 +1,9 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from app import db
 from app.models import User, UserRole, Mover
+from app.utils.hashing import HashingPoolBusy
+from app.utils.decorators import get_current_user as load_current_user, create_user_token
 from email_validator import validate_email, EmailNotValidError
 
 bp = Blueprint('auth', __name__)
@@ -57,8 +59,8 @@ def register():
             db.session.add(mover)
             db.session.commit()
         
-        # Generate access token (convert ID to string for JWT compatibility)
-        access_token = create_access_token(identity=str(user.id))
+        # Generate access token with role claims (ID as string for JWT compatibility)
+        access_token = create_user_token(user)
         
         return jsonify({
             'message': 'Registration successful',
@@ -66,6 +68,9 @@ def register():
             'user': user.to_dict()
         }), 201
         
+    except HashingPoolBusy as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -89,8 +94,13 @@ def login():
         if not user.is_active:
             return jsonify({'error': 'Account is deactivated'}), 403
         
-        # Generate access token (convert ID to string for JWT compatibility)
-        access_token = create_access_token(identity=str(user.id))
+        # Transparently upgrade hashes made with an old work factor
+        if user.password_needs_rehash():
+            user.set_password(data['password'])
+            db.session.commit()
+        
+        # Generate access token with role claims (ID as string for JWT compatibility)
+        access_token = create_user_token(user)
         
         return jsonify({
             'message': 'Login successful',
@@ -98,7 +108,10 @@ def login():
             'user': user.to_dict()
         }), 200
         
+    except HashingPoolBusy as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/me', methods=['GET'])
@@ -106,8 +119,7 @@ def login():
 def get_current_user():
     """Get current user info"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = load_current_user()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -1,93 +1,259 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, current_app
 from flask_jwt_extended import jwt_required
 from app import db
-from app.utils.decorators import get_current_user, role_required
-from app.models import Booking, BookingStatus, Mover, BookingStatusUpdate
-from datetime import datetime
+from app.utils.decorators import get_current_user, role_required, get_auth_claims
+from app.utils.pricing import calculate_pricing, price_all_movers
+from app.utils.events import booking_topic, format_sse, get_broker, publish_after_commit
+from app.utils.tracking import ping_buffer, get_latest_position
+from app.utils.cache import TTLCache
+from app.utils.geo import haversine_km
+from app.utils.distance import distance_engine, parse_point, resolve_distance
+from app.models import Booking, BookingStatus, Mover, MoverSlot, BookingStatusUpdate, BookingDailyStat, UserInventory
+from datetime import datetime, timedelta, timezone
+import time
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 
 bp = Blueprint('bookings', __name__)
 
-def calculate_pricing(distance_km, total_volume, mover):
-    """Calculate booking price"""
-    base_price = distance_km * mover.base_price_per_km
-    volume_price = total_volume * mover.price_per_cubic_meter
-    
-    # Labor cost based on volume (more items = more workers/time)
-    if total_volume <= 5:
-        labor_cost = 1000
-    elif total_volume <= 10:
-        labor_cost = 2000
-    else:
-        labor_cost = 3000
-    
-    # Packing materials based on volume
-    packing_cost = total_volume * 100
-    
-    # Service fee (platform fee - 10%)
-    service_fee = 0  # Free for clients (charged to movers)
-    
-    total = base_price + volume_price + labor_cost + packing_cost + service_fee
-    
-    return {
-        'base_price': round(base_price, 2),
-        'labor_cost': round(labor_cost, 2),
-        'packing_materials_cost': round(packing_cost, 2),
-        'service_fee': round(service_fee, 2),
-        'total_price': round(total, 2)
-    }
+# booking_id -> mover_id of bookings that were open when looked up, so
+# high-frequency pings skip the booking lookup. Only the worker that closes a
+# booking evicts it; other workers keep accepting its pings (with 202) for up
+# to the TTL, and the ping flusher drops those received after the close.
+ping_targets = TTLCache(ttl=60, maxsize=10000)
 
 @bp.route('/movers', methods=['GET'])
 def get_movers():
-    """Get all approved movers"""
+    """
+    Get all approved movers. With ?lat=&lng= (pickup point), only movers
+    whose service area covers the point are returned, nearest first.
+    ?zone= (repeatable or comma-separated) keeps movers covering every zone.
+    ?date=&time= (and optional &volume=) keeps movers free for that slot.
+    """
     try:
-        movers = Mover.query.filter_by(
+        query = Mover.query.options(joinedload(Mover.user)).filter_by(
             is_approved=True,
             is_available=True
-        ).all()
+        )
         
-        movers_data = []
-        for mover in movers:
-            mover_dict = mover.to_dict(include_user=True)
+        zones = [zone for value in request.args.getlist('zone') for zone in value.split(',')]
+        if zones:
+            query = Mover.in_zones(zones, query=query)
+        
+        if 'date' in request.args or 'time' in request.args:
+            try:
+                slot_date = datetime.strptime(request.args.get('date', ''), '%Y-%m-%d').date()
+                slot_time = datetime.strptime(request.args.get('time', ''), '%H:%M').time()
+            except ValueError:
+                return jsonify({'error': 'date (YYYY-MM-DD) and time (HH:MM) are required together'}), 400
+            volume = request.args.get('volume', type=float)
+            query = Mover.available_for(slot_date, slot_time, volume=volume, query=query)
+        
+        lat = request.args.get('lat', type=float)
+        lng = request.args.get('lng', type=float)
+        distances = {}
+        if lat is not None and lng is not None:
+            if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+                return jsonify({'error': 'Invalid coordinates'}), 400
+            matches = Mover.covering_point(lat, lng, query=query)
+            movers = [mover for mover, _ in matches]
+            distances = {mover.id: distance for mover, distance in matches}
+        else:
+            movers = query.all()
+        
+        movers_data = Mover.to_dict_many(movers, include_user=True)
+        for mover_dict in movers_data:
             # Add estimated time (mock calculation)
             mover_dict['estimated_time'] = '4-5 hours'
-            movers_data.append(mover_dict)
+            if mover_dict['id'] in distances:
+                mover_dict['distance_km'] = round(distances[mover_dict['id']], 2)
         
         return jsonify({'movers': movers_data}), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/movers/<int:mover_id>/availability', methods=['GET'])
+def get_mover_availability(mover_id):
+    """Get a mover's slot calendar for ?date=YYYY-MM-DD"""
+    try:
+        mover = Mover.query.get(mover_id)
+        if not mover or not mover.is_approved:
+            return jsonify({'error': 'Mover not found'}), 404
+        
+        try:
+            slot_date = datetime.strptime(request.args.get('date', ''), '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'error': 'date (YYYY-MM-DD) is required'}), 400
+        
+        taken = {
+            start for (start,) in db.session.query(MoverSlot.slot_start).filter_by(
+                mover_id=mover.id,
+                slot_date=slot_date
+            )
+        }
+        
+        return jsonify({
+            'mover_id': mover.id,
+            'date': slot_date.isoformat(),
+            'slot_minutes': current_app.config['BOOKING_SLOT_MINUTES'],
+            'vehicle_capacity': mover.vehicle_capacity,
+            'slots': [
+                {'start': start.strftime('%H:%M'), 'available': mover.is_available and start not in taken}
+                for start in MoverSlot.day_starts()
+            ]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _resolve_volume(data, user_id):
+    """
+    Move volume for a quote or booking: from the client's inventory when
+    inventory_id is given, else total_volume.
+    Returns (total_volume, items_count, inventory, error response).
+    """
+    if data.get('inventory_id') is not None:
+        inventory = UserInventory.booking_totals(data['inventory_id'], user_id)
+        if inventory is None:
+            return None, None, None, (jsonify({'error': 'Inventory not found'}), 404)
+        if not inventory.total_volume:
+            return None, None, None, (jsonify({'error': 'Inventory has no items'}), 400)
+        return float(inventory.total_volume), int(inventory.items_count), inventory, None
+    
+    if data.get('total_volume') is None:
+        return None, None, None, (jsonify({'error': 'inventory_id or total_volume is required'}), 400)
+    try:
+        return float(data['total_volume']), None, None, None
+    except (TypeError, ValueError):
+        return None, None, None, (jsonify({'error': 'total_volume must be a number'}), 400)
+
 @bp.route('/estimate', methods=['POST'])
 @jwt_required()
 def calculate_estimate():
-    """Calculate price estimate"""
+    """
+    Calculate price estimate. Distance is computed from pickup/dropoff
+    coordinates when given, otherwise taken from distance_km; volume comes
+    from inventory_id when given, otherwise total_volume.
+    """
     try:
         data = request.get_json()
         
         # Validate required fields
-        required = ['mover_id', 'distance_km', 'total_volume']
-        for field in required:
-            if field not in data:
-                return jsonify({'error': f'{field} is required'}), 400
+        if 'mover_id' not in data:
+            return jsonify({'error': 'mover_id is required'}), 400
+        
+        total_volume, items_count, _, error = _resolve_volume(data, get_auth_claims()['user_id'])
+        if error:
+            return error
+        
+        try:
+            distance_km = resolve_distance(data)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid coordinates or distance_km'}), 400
+        if distance_km is None:
+            return jsonify({'error': 'pickup/dropoff coordinates or distance_km is required'}), 400
         
         mover = Mover.query.get(data['mover_id'])
         if not mover:
             return jsonify({'error': 'Mover not found'}), 404
         
         pricing = calculate_pricing(
-            distance_km=data['distance_km'],
-            total_volume=data['total_volume'],
+            distance_km=distance_km,
+            total_volume=total_volume,
             mover=mover
         )
         
         return jsonify({
             'estimate': pricing,
+            'distance_km': distance_km,
+            'total_volume': total_volume,
+            'items_count': items_count,
             'mover': mover.to_dict()
         }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/estimate/batch', methods=['POST'])
+@jwt_required()
+def calculate_batch_estimate():
+    """
+    Price every available mover in one pass.
+    Body: {distance_km, total_volume} or {trips: [{distance_km, total_volume}, ...]},
+    where pickup/dropoff coordinates may replace distance_km, and optional limit to return only
+    the cheapest N quotes per trip.
+    """
+    try:
+        data = request.get_json() or {}
+        
+        trips = data.get('trips')
+        if trips is None:
+            trips = [data]
+        if not isinstance(trips, list) or not trips:
+            return jsonify({'error': 'trips must be a non-empty list'}), 400
+        if len(trips) > current_app.config['BATCH_ESTIMATE_MAX_TRIPS']:
+            return jsonify({'error': 'Too many trips in one request'}), 400
+        
+        parsed = []
+        for trip in trips:
+            if 'total_volume' not in trip:
+                return jsonify({'error': 'total_volume is required'}), 400
+            try:
+                distance_km = resolve_distance(trip)
+                if distance_km is None:
+                    return jsonify({'error': 'pickup/dropoff coordinates or distance_km is required'}), 400
+                parsed.append((distance_km, float(trip['total_volume'])))
+            except (TypeError, ValueError):
+                return jsonify({'error': 'distance_km and total_volume must be numbers'}), 400
+        
+        limit = data.get('limit')
+        if limit is not None and (not isinstance(limit, int) or limit < 1):
+            return jsonify({'error': 'limit must be a positive integer'}), 400
+        
+        results = price_all_movers(
+            parsed,
+            max_age=current_app.config['PRICE_TABLE_MAX_AGE'],
+            limit=limit
+        )
+        
+        if 'trips' not in data:
+            return jsonify({'quotes': results[0]['quotes']}), 200
+        return jsonify({'results': results}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/distance-matrix', methods=['POST'])
+@jwt_required()
+def get_distance_matrix():
+    """
+    Road distance estimates for every origin/destination pair.
+    Body: {origins: [{latitude, longitude}, ...], destinations: [...]}
+    """
+    try:
+        data = request.get_json() or {}
+        origins = data.get('origins')
+        destinations = data.get('destinations')
+        if not isinstance(origins, list) or not isinstance(destinations, list) or not origins or not destinations:
+            return jsonify({'error': 'origins and destinations must be non-empty lists'}), 400
+        if len(origins) * len(destinations) > current_app.config['DISTANCE_MATRIX_MAX_CELLS']:
+            return jsonify({'error': 'Too many origin/destination pairs in one request'}), 400
+        
+        try:
+            origins = [parse_point(point) for point in origins]
+            destinations = [parse_point(point) for point in destinations]
+        except (AttributeError, TypeError, ValueError):
+            return jsonify({'error': 'Each point needs a valid latitude and longitude'}), 400
+        if None in origins or None in destinations:
+            return jsonify({'error': 'Each point needs a valid latitude and longitude'}), 400
+        
+        return jsonify({'distances_km': distance_engine.matrix(origins, destinations)}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @bp.route('/', methods=['POST'])
 @jwt_required()
 @role_required(['client'])
@@ -100,12 +266,27 @@ def create_booking():
         # Validate required fields
         required = [
             'mover_id', 'pickup_address', 'dropoff_address',
-            'scheduled_date', 'scheduled_time', 'distance_km', 'total_volume'
+            'scheduled_date', 'scheduled_time'
         ]
         for field in required:
             if field not in data:
                 return jsonify({'error': f'{field} is required'}), 400
         
+        # Volume and item count are computed from the linked inventory when given
+        total_volume, items_count, inventory, error = _resolve_volume(data, user.id)
+        if error:
+            return error
+        if inventory is not None and inventory.booking_id is not None:
+            return jsonify({'error': 'Inventory is already linked to a booking'}), 400
+        
+        # Bookings are priced only from a distance computed on the server
+        try:
+            distance_km = resolve_distance(data, allow_client_distance=False)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid coordinates'}), 400
+        if distance_km is None:
+            return jsonify({'error': 'pickup and dropoff coordinates are required'}), 400
+        
         # Get mover
         mover = Mover.query.get(data['mover_id'])
         if not mover:
@@ -114,10 +295,13 @@ def create_booking():
         if not mover.is_approved or not mover.is_available:
             return jsonify({'error': 'Mover is not available'}), 400
         
+        if mover.vehicle_capacity is not None and total_volume > mover.vehicle_capacity:
+            return jsonify({'error': 'Move volume exceeds the mover\'s vehicle capacity'}), 400
+        
         # Calculate pricing
         pricing = calculate_pricing(
-            distance_km=data['distance_km'],
-            total_volume=data['total_volume'],
+            distance_km=distance_km,
+            total_volume=total_volume,
             mover=mover
         )
         
@@ -143,8 +327,9 @@ def create_booking():
             dropoff_details=data.get('dropoff_details'),
             scheduled_date=scheduled_date,
             scheduled_time=scheduled_time,
-            distance_km=data['distance_km'],
-            total_volume=data['total_volume'],
+            distance_km=distance_km,
+            total_volume=total_volume,
+            items_count=items_count,
             base_price=pricing['base_price'],
             labor_cost=pricing['labor_cost'],
             packing_materials_cost=pricing['packing_materials_cost'],
@@ -156,6 +341,24 @@ def create_booking():
         db.session.add(booking)
         db.session.flush()
         
+        # Reserve the mover's slot; the unique key rejects a concurrent double-booking
+        db.session.add(MoverSlot.for_booking(booking))
+        try:
+            db.session.flush()
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({'error': 'Mover is already booked for this time slot'}), 409
+        
+        # Link the inventory; the booking_id IS NULL guard loses cleanly to a concurrent booking
+        if inventory is not None:
+            linked = UserInventory.query.filter_by(id=inventory.id, booking_id=None).update(
+                {UserInventory.booking_id: booking.id},
+                synchronize_session=False
+            )
+            if not linked:
+                db.session.rollback()
+                return jsonify({'error': 'Inventory is already linked to a booking'}), 400
+        
         # Add initial status update
         status_update = BookingStatusUpdate(
             booking_id=booking.id,
@@ -165,6 +368,8 @@ def create_booking():
         )
         db.session.add(status_update)
         
+        BookingDailyStat.record_booking(booking)
+        
         db.session.commit()
         
         return jsonify({
@@ -181,16 +386,16 @@ def create_booking():
 def get_booking(booking_id):
     """Get booking details"""
     try:
-        user = get_current_user()
+        claims = get_auth_claims()
         booking = Booking.query.get(booking_id)
         
         if not booking:
             return jsonify({'error': 'Booking not found'}), 404
         
         # Check authorization
-        if user.role.value == 'client' and booking.client_id != user.id:
+        if claims['role'] == 'client' and booking.client_id != claims['user_id']:
             return jsonify({'error': 'Access denied'}), 403
-        elif user.role.value == 'mover' and booking.mover_id != user.mover_profile.id:
+        elif claims['role'] == 'mover' and booking.mover_id != claims['mover_id']:
             return jsonify({'error': 'Access denied'}), 403
         
         return jsonify({
@@ -203,29 +408,65 @@ def get_booking(booking_id):
 @bp.route('/<int:booking_id>/tracking', methods=['GET'])
 @jwt_required()
 def get_tracking(booking_id):
-    """Get booking tracking information"""
+    """
+    Get booking tracking information. ?since=<update id|ISO timestamp>
+    returns only status updates after it; reuse the response cursor.
+    """
     try:
-        user = get_current_user()
+        claims = get_auth_claims()
         booking = Booking.query.get(booking_id)
         
         if not booking:
             return jsonify({'error': 'Booking not found'}), 404
         
         # Check authorization
-        if user.role.value == 'client' and booking.client_id != user.id:
+        if claims['role'] == 'client' and booking.client_id != claims['user_id']:
             return jsonify({'error': 'Access denied'}), 403
         
-        # Get status updates
-        updates = booking.status_updates.all()
-        
-        # Mock current location for demo
+        # Get status updates, only the new ones when the client has a cursor
+        updates_query = booking.status_updates.order_by(None).order_by(
+            BookingStatusUpdate.created_at, BookingStatusUpdate.id
+        )
+        since = request.args.get('since')
+        if since:
+            if since.isdigit():
+                since_update = db.session.query(BookingStatusUpdate.created_at, BookingStatusUpdate.id).filter_by(
+                    id=int(since),
+                    booking_id=booking.id
+                ).first()
+                if since_update:
+                    updates_query = updates_query.filter(
+                        tuple_(BookingStatusUpdate.created_at, BookingStatusUpdate.id) > tuple_(*since_update)
+                    )
+                else:
+                    updates_query = updates_query.filter(BookingStatusUpdate.id > int(since))
+            else:
+                try:
+                    since_time = datetime.fromisoformat(since.replace('Z', '+00:00'))
+                except ValueError:
+                    return jsonify({'error': 'since must be an update id or ISO timestamp'}), 400
+                if since_time.tzinfo is not None:
+                    since_time = since_time.astimezone(timezone.utc).replace(tzinfo=None)
+                updates_query = updates_query.filter(BookingStatusUpdate.created_at > since_time)
+        updates = updates_query.all()
+        # Updates are returned through the newest, so the last one is the active step
+        last_index = len(updates) - 1
+        
+        # Latest GPS ping when the mover's device is reporting; mock otherwise for demo
+        position = get_latest_position(booking.id)
         current_location = 'Mombasa Road, Nairobi'
         estimated_arrival = '2:00 PM'
         distance_remaining = 8.5
+        if position and booking.dropoff_latitude is not None and booking.dropoff_longitude is not None:
+            distance_remaining = round(haversine_km(
+                position['latitude'], position['longitude'],
+                booking.dropoff_latitude, booking.dropoff_longitude
+            ), 2)
         
         data = {
             'status': booking.status.value,
             'current_location': current_location,
+            'position': position,
             'estimated_arrival': estimated_arrival,
             'distance_remaining': distance_remaining,
             'mover': {
@@ -240,13 +481,15 @@ def get_tracking(booking_id):
             },
             'status_updates': [
                 {
+                    'id': update.id,
                     'status': update.status,
                     'timestamp': update.created_at.strftime('%b %d, %Y - %I:%M %p'),
-                    'completed': True if update != updates[-1] else False,
-                    'active': True if update == updates[-1] else False
+                    'completed': index != last_index,
+                    'active': index == last_index
                 }
-                for update in updates
-            ]
+                for index, update in enumerate(updates)
+            ],
+            'cursor': str(updates[-1].id) if updates else since
         }
         
         return jsonify(data), 200
@@ -254,19 +497,222 @@ def get_tracking(booking_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+TERMINAL_STATUSES = {BookingStatus.COMPLETED.value, BookingStatus.CANCELLED.value}
+
+def _status_event(update, booking_status):
+    """Tracking event for a status update"""
+    data = update.to_dict()
+    data['booking_status'] = booking_status
+    return {'id': update.id, 'type': 'status', 'data': data}
+
+def _tracked_booking(booking_id):
+    """Load a booking the caller may track; returns (booking, error response)"""
+    claims = get_auth_claims()
+    booking = Booking.query.get(booking_id)
+    
+    if not booking:
+        return None, (jsonify({'error': 'Booking not found'}), 404)
+    
+    if claims['role'] == 'client' and booking.client_id != claims['user_id']:
+        return None, (jsonify({'error': 'Access denied'}), 403)
+    
+    return booking, None
+
+def _events_after(booking, after_id):
+    """Status events committed after after_id, oldest first"""
+    updates = booking.status_updates.filter(BookingStatusUpdate.id > after_id).order_by(BookingStatusUpdate.id)
+    return [_status_event(update, booking.status.value) for update in updates]
+
+@bp.route('/<int:booking_id>/tracking/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_tracking(booking_id):
+    """
+    Server-Sent Events stream of new status updates and location pings.
+    Reconnecting clients send Last-Event-ID and get the updates they missed.
+    """
+    try:
+        booking, error = _tracked_booking(booking_id)
+        if error:
+            return error
+        
+        last_id = request.headers.get('Last-Event-ID', type=int)
+        if last_id is None:
+            last_id = request.args.get('last_event_id', type=int)
+        finished = booking.status.value in TERMINAL_STATUSES
+        stream_timeout = current_app.config['TRACKING_STREAM_TIMEOUT']
+        heartbeat = current_app.config['TRACKING_HEARTBEAT']
+        
+        # Subscribe before replaying so nothing committed in between is lost
+        subscription = get_broker().subscribe(booking_topic(booking.id))
+        try:
+            backlog = _events_after(booking, last_id) if last_id is not None else []
+        except Exception:
+            subscription.close()
+            raise
+        # The stream needs no database access; hand the connection back now
+        db.session.close()
+        
+        def generate():
+            seen = max([last_id or 0] + [event['id'] for event in backlog])
+            try:
+                yield f'retry: {heartbeat * 1000}\n\n'
+                for event in backlog:
+                    yield format_sse(event)
+                if finished:
+                    return
+                deadline = time.monotonic() + stream_timeout
+                while time.monotonic() < deadline:
+                    event = subscription.get(timeout=heartbeat)
+                    if event is None:
+                        yield ': keep-alive\n\n'
+                        continue
+                    if event.get('id') is not None:
+                        if event['id'] <= seen:
+                            continue
+                        seen = event['id']
+                    yield format_sse(event)
+                    if event['data'].get('booking_status') in TERMINAL_STATUSES:
+                        return
+            finally:
+                subscription.close()
+        
+        return Response(generate(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/<int:booking_id>/tracking/poll', methods=['GET'])
+@jwt_required()
+def poll_tracking(booking_id):
+    """
+    Long-poll fallback for the tracking stream: returns events after
+    ?after=<event id>, waiting up to ?timeout= seconds for new ones.
+    """
+    try:
+        booking, error = _tracked_booking(booking_id)
+        if error:
+            return error
+        
+        after = request.args.get('after', 0, type=int)
+        max_wait = current_app.config['TRACKING_POLL_TIMEOUT']
+        wait = min(max(request.args.get('timeout', max_wait, type=float), 0), max_wait)
+        
+        with get_broker().subscribe(booking_topic(booking.id)) as subscription:
+            events = _events_after(booking, after)
+            db.session.close()
+            if not events and wait and booking.status.value not in TERMINAL_STATUSES:
+                event = subscription.get(timeout=wait)
+                if event is not None:
+                    events = [event] + subscription.drain()
+        
+        events = [event for event in events if event.get('id') is None or event['id'] > after]
+        cursor = max([after] + [event['id'] for event in events if event.get('id') is not None])
+        
+        return jsonify({'events': events, 'cursor': cursor}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+PING_MAX_AGE = timedelta(days=1)
+PING_MAX_SKEW = timedelta(minutes=5)
+
+def _parse_ping(item, booking_id, mover_id, received_at):
+    """Validate one device ping into a LocationPing row"""
+    latitude = float(item['latitude'])
+    longitude = float(item['longitude'])
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError('Invalid coordinates')
+    recorded_at = received_at
+    if item.get('recorded_at'):
+        recorded_at = datetime.fromisoformat(str(item['recorded_at']).replace('Z', '+00:00'))
+        if recorded_at.tzinfo is not None:
+            recorded_at = recorded_at.astimezone(timezone.utc).replace(tzinfo=None)
+        # Outside this window the clock is wrong, and the row may have no partition to land in
+        if not (received_at - PING_MAX_AGE <= recorded_at <= received_at + PING_MAX_SKEW):
+            raise ValueError('recorded_at is out of range')
+    
+    def optional(key):
+        return float(item[key]) if item.get(key) is not None else None
+    
+    return {
+        'booking_id': booking_id,
+        'recorded_at': recorded_at,
+        'mover_id': mover_id,
+        'latitude': latitude,
+        'longitude': longitude,
+        'accuracy_m': optional('accuracy_m'),
+        'speed_kmh': optional('speed_kmh'),
+        'heading': optional('heading'),
+        'received_at': received_at
+    }
+
+@bp.route('/<int:booking_id>/location', methods=['POST'])
+@jwt_required()
+@role_required(['mover'])
+def ingest_location(booking_id):
+    """
+    Accept GPS pings from the mover's device: a single ping or {"pings": [...]}.
+    A single ping without recorded_at is stamped on receipt; batched pings
+    must carry their own. Pings are buffered and written in batches; returns 202.
+    """
+    try:
+        claims = get_auth_claims()
+        
+        mover_id = ping_targets.get(booking_id)
+        if mover_id is None:
+            booking = db.session.query(Booking.mover_id, Booking.status).filter_by(id=booking_id).first()
+            if not booking:
+                return jsonify({'error': 'Booking not found'}), 404
+            if booking.mover_id != claims['mover_id']:
+                return jsonify({'error': 'Access denied'}), 403
+            if booking.status.value in TERMINAL_STATUSES:
+                return jsonify({'error': 'Booking is no longer active'}), 409
+            mover_id = booking.mover_id
+            ping_targets.set(booking_id, mover_id)
+        elif mover_id != claims['mover_id']:
+            return jsonify({'error': 'Access denied'}), 403
+        
+        data = request.get_json() or {}
+        batched = isinstance(data.get('pings'), list)
+        items = data['pings'] if batched else [data]
+        if not items:
+            return jsonify({'error': 'No pings provided'}), 400
+        if len(items) > current_app.config['PING_MAX_BATCH']:
+            return jsonify({'error': f"At most {current_app.config['PING_MAX_BATCH']} pings per request"}), 400
+        # Pings are keyed by (booking, recorded_at); stamping a batch with one
+        # server time would collapse it to a single row
+        if batched and not all(isinstance(item, dict) and item.get('recorded_at') for item in items):
+            return jsonify({'error': 'Each ping in a batch needs recorded_at'}), 400
+        
+        received_at = datetime.utcnow()
+        try:
+            rows = [_parse_ping(item, booking_id, mover_id, received_at) for item in items]
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'error': 'Each ping needs valid latitude, longitude and an optional recent ISO recorded_at'}), 400
+        
+        ping_buffer.add(rows)
+        
+        return jsonify({'accepted': len(rows)}), 202
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @bp.route('/<int:booking_id>/status', methods=['PUT'])
 @jwt_required()
 @role_required(['mover'])
 def update_booking_status(booking_id):
     """Update booking status (mover only)"""
     try:
-        user = get_current_user()
+        claims = get_auth_claims()
         booking = Booking.query.get(booking_id)
         
         if not booking:
             return jsonify({'error': 'Booking not found'}), 404
         
-        if booking.mover_id != user.mover_profile.id:
+        if booking.mover_id != claims['mover_id']:
             return jsonify({'error': 'Access denied'}), 403
         
         data = request.get_json()
@@ -275,10 +721,24 @@ def update_booking_status(booking_id):
         # Validate status
         try:
             status_enum = BookingStatus(new_status)
-            booking.status = status_enum
         except ValueError:
             return jsonify({'error': 'Invalid status'}), 400
         
+        old_status = booking.status
+        booking.status = status_enum
+        BookingDailyStat.record_status_change(booking, old_status)
+        
+        # A cancelled booking frees the mover's slot; reinstating it takes the slot back
+        if status_enum == BookingStatus.CANCELLED and booking.slot:
+            db.session.delete(booking.slot)
+        elif status_enum != BookingStatus.CANCELLED and not booking.slot:
+            db.session.add(MoverSlot.for_booking(booking))
+            try:
+                db.session.flush()
+            except IntegrityError:
+                db.session.rollback()
+                return jsonify({'error': 'Mover is already booked for this time slot'}), 409
+        
         # Add status update
         status_update = BookingStatusUpdate(
             booking_id=booking.id,
@@ -286,17 +746,21 @@ def update_booking_status(booking_id):
             latitude=data.get('latitude'),
             longitude=data.get('longitude'),
             notes=data.get('notes'),
-            updated_by=user.id
+            updated_by=claims['user_id']
         )
         db.session.add(status_update)
+        db.session.flush()
+        publish_after_commit(booking_topic(booking.id), _status_event(status_update, status_enum.value))
         
-        # Update mover stats if completed
+        # Update mover stats if completed; rating is kept current as reviews arrive
         if status_enum == BookingStatus.COMPLETED:
-            mover = user.mover_profile
-            mover.total_jobs_completed += 1
-            mover.rating = mover.calculate_rating()
+            Mover.query.filter_by(id=booking.mover_id).update(
+                {Mover.total_jobs_completed: Mover.total_jobs_completed + 1},
+                synchronize_session=False
+            )
         
         db.session.commit()
+        ping_targets.invalidate(booking.id)
         
         return jsonify({
             'message': 'Status updated successfully',
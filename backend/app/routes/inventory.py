@@ -1,35 +1,29 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from flask_jwt_extended import jwt_required
 from app import db
 from app.utils.decorators import get_current_user
-from app.models import InventoryTemplate, UserInventory, InventoryItem, RoomType
+from app.utils.catalog import get_room_templates, template_catalog
+from app.models import UserInventory, InventoryItem, RoomType
 
 bp = Blueprint('inventory', __name__)
 
 @bp.route('/templates', methods=['GET'])
 def get_templates():
-    """Get inventory templates by room type"""
+    """Get inventory templates by room type (served from the in-memory catalog)"""
     try:
         room_type = request.args.get('room_type')
+        max_age = current_app.config['TEMPLATE_CATALOG_MAX_AGE']
         
-        query = InventoryTemplate.query
-        if room_type:
-            try:
-                query = query.filter_by(room_type=RoomType(room_type))
-            except ValueError:
-                return jsonify({'error': 'Invalid room type'}), 400
-        
-        templates = query.all()
-        
-        # Group by room type
-        grouped = {}
-        for template in templates:
-            room = template.room_type.value
-            if room not in grouped:
-                grouped[room] = []
-            grouped[room].append(template.to_dict())
+        try:
+            grouped, etag = get_room_templates(room_type, max_age)
+        except ValueError:
+            return jsonify({'error': 'Invalid room type'}), 400
         
-        return jsonify({'templates': grouped}), 200
+        response = jsonify({'templates': grouped})
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = f'public, max-age={max_age}'
+        response.headers['X-Catalog-Version'] = str(template_catalog.version)
+        return response.make_conditional(request)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -56,19 +50,13 @@ def create_inventory():
         db.session.add(inventory)
         db.session.flush()
         
-        # Add items
+        # Add items in one multi-row insert
         items = data.get('items', [])
-        for item_data in items:
-            if item_data.get('quantity', 0) > 0:
-                item = InventoryItem(
-                    inventory_id=inventory.id,
-                    item_name=item_data['item_name'],
-                    quantity=item_data['quantity'],
-                    estimated_volume=item_data.get('estimated_volume', 0.0),
-                    is_custom=item_data.get('is_custom', False),
-                    notes=item_data.get('notes')
-                )
-                db.session.add(item)
+        InventoryItem.bulk_insert([
+            InventoryItem.row_from_dict(inventory.id, item_data)
+            for item_data in items
+            if item_data.get('quantity', 0) > 0
+        ])
         
         db.session.commit()
         
@@ -90,7 +78,7 @@ def get_user_inventories():
         inventories = UserInventory.query.filter_by(user_id=user.id).all()
         
         return jsonify({
-            'inventories': [inv.to_dict() for inv in inventories]
+            'inventories': UserInventory.to_dict_many(inventories)
         }), 200
         
     except Exception as e:
@@ -131,28 +119,16 @@ def update_inventory(inventory_id):
         
         data = request.get_json()
         
-        # Update items
+        # Update only the items that changed
+        changes = {'inserted': 0, 'updated': 0, 'deleted': 0}
         if 'items' in data:
-            # Delete existing items
-            InventoryItem.query.filter_by(inventory_id=inventory.id).delete()
-            
-            # Add new items
-            for item_data in data['items']:
-                if item_data.get('quantity', 0) > 0:
-                    item = InventoryItem(
-                        inventory_id=inventory.id,
-                        item_name=item_data['item_name'],
-                        quantity=item_data['quantity'],
-                        estimated_volume=item_data.get('estimated_volume', 0.0),
-                        is_custom=item_data.get('is_custom', False),
-                        notes=item_data.get('notes')
-                    )
-                    db.session.add(item)
+            changes = inventory.sync_items(data['items'])
         
         db.session.commit()
         
         return jsonify({
             'message': 'Inventory updated successfully',
+            'changes': changes,
             'inventory': inventory.to_dict()
         }), 200
         
@@ -1,10 +1,11 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from flask_jwt_extended import jwt_required
 from app import db
-from app.utils.decorators import role_required, get_current_user
-from app.models import Booking, BookingStatus, Mover, Review
-from datetime import datetime
-from sqlalchemy import func, extract
+from app.utils.decorators import role_required, get_current_user, get_auth_claims
+from app.utils.pagination import get_page_size, keyset_page
+from app.models import Booking, BookingStatus, Mover, Review, BookingDailyStat, User
+from datetime import datetime, timedelta
+from sqlalchemy import func, case, and_
 
 bp = Blueprint('mover', __name__)
 
@@ -20,36 +21,35 @@ def get_dashboard():
         if not mover:
             return jsonify({'error': 'Mover profile not found'}), 404
         
-        current_month = datetime.utcnow().month
-        current_year = datetime.utcnow().year
-        
-        # Get active jobs
-        active_jobs = Booking.query.filter_by(
-            mover_id=mover.id,
-            status=BookingStatus.IN_PROGRESS
-        ).count()
-        
-        # Get earnings this month
-        total_earnings = db.session.query(func.sum(Booking.total_price)).filter(
-            Booking.mover_id == mover.id,
-            Booking.status == BookingStatus.COMPLETED,
-            extract('month', Booking.scheduled_date) == current_month,
-            extract('year', Booking.scheduled_date) == current_year
-        ).scalar() or 0
-        
-        # Get jobs completed this month
-        jobs_this_month = Booking.query.filter(
-            Booking.mover_id == mover.id,
-            Booking.status == BookingStatus.COMPLETED,
-            extract('month', Booking.scheduled_date) == current_month,
-            extract('year', Booking.scheduled_date) == current_year
-        ).count()
+        today = datetime.utcnow().date()
+        month_start = today.replace(day=1)
+        next_month_start = (month_start + timedelta(days=32)).replace(day=1)
+        
+        # Job counts and earnings come from the daily rollup
+        completed = BookingDailyStat.status == BookingStatus.COMPLETED
+        this_month = and_(
+            completed,
+            BookingDailyStat.day >= month_start,
+            BookingDailyStat.day < next_month_start
+        )
+        stats = db.session.query(
+            func.coalesce(func.sum(case(
+                (BookingDailyStat.status == BookingStatus.IN_PROGRESS, BookingDailyStat.booking_count),
+                else_=0
+            )), 0).label('active_jobs'),
+            func.coalesce(func.sum(case((this_month, BookingDailyStat.revenue), else_=0)), 0).label('total_earnings'),
+            func.coalesce(func.sum(case((this_month, BookingDailyStat.booking_count), else_=0)), 0).label('jobs_this_month')
+        ).filter(BookingDailyStat.mover_id == mover.id).one()
+        
+        active_jobs = stats.active_jobs
+        total_earnings = stats.total_earnings
+        jobs_this_month = stats.jobs_this_month
         
         # Get upcoming jobs
         upcoming_jobs = Booking.query.filter(
             Booking.mover_id == mover.id,
             Booking.status.in_([BookingStatus.CONFIRMED, BookingStatus.IN_PROGRESS]),
-            Booking.scheduled_date >= datetime.utcnow().date()
+            Booking.scheduled_date >= today
         ).order_by(Booking.scheduled_date.asc(), Booking.scheduled_time.asc()).limit(5).all()
         
         # Get recent reviews
@@ -98,51 +98,82 @@ def get_dashboard():
 @jwt_required()
 @role_required(['mover'])
 def get_jobs():
-    """Get all mover jobs with filters"""
+    """
+    Get mover jobs, latest scheduled first, one keyset page at a time.
+    Query params: status, date_from/date_to (YYYY-MM-DD), limit, cursor.
+    """
     try:
-        user = get_current_user()
-        mover = user.mover_profile
+        mover_id = get_auth_claims()['mover_id']
         
-        if not mover:
+        if not mover_id:
             return jsonify({'error': 'Mover profile not found'}), 404
         
-        # Get filter parameters
-        status_filter = request.args.get('status', 'all')
-        
-        # Base query
-        query = Booking.query.filter_by(mover_id=mover.id)
+        # Only the columns the listing shows; client name/phone come from the join
+        query = db.session.query(
+            Booking.id,
+            Booking.booking_reference,
+            Booking.scheduled_date,
+            Booking.scheduled_time,
+            Booking.pickup_address,
+            Booking.dropoff_address,
+            Booking.distance_km,
+            Booking.items_count,
+            Booking.total_volume,
+            Booking.total_price,
+            Booking.status,
+            User.full_name.label('client_name'),
+            User.phone_number.label('client_phone')
+        ).outerjoin(User, User.id == Booking.client_id).filter(Booking.mover_id == mover_id)
         
         # Apply status filter
+        status_filter = request.args.get('status', 'all')
         if status_filter != 'all':
             try:
-                status = BookingStatus(status_filter)
-                query = query.filter_by(status=status)
+                query = query.filter(Booking.status == BookingStatus(status_filter))
             except ValueError:
                 pass
         
-        # Order by date
-        jobs = query.order_by(Booking.scheduled_date.desc()).all()
+        try:
+            if request.args.get('date_from'):
+                query = query.filter(Booking.scheduled_date >= datetime.strptime(request.args['date_from'], '%Y-%m-%d').date())
+            if request.args.get('date_to'):
+                query = query.filter(Booking.scheduled_date <= datetime.strptime(request.args['date_to'], '%Y-%m-%d').date())
+        except ValueError:
+            return jsonify({'error': 'date_from and date_to must be YYYY-MM-DD'}), 400
+        
+        try:
+            jobs, next_cursor = keyset_page(
+                query,
+                Booking.scheduled_date,
+                Booking.id,
+                cursor=request.args.get('cursor'),
+                limit=get_page_size(request.args.get('limit'))
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         data = {
             'jobs': [
                 {
                     'id': job.id,
                     'booking_ref': job.booking_reference,
-                    'client_name': job.client.full_name if job.client else 'Unknown',
-                    'client_phone': job.client.phone_number if job.client else None,
+                    'client_name': job.client_name or 'Unknown',
+                    'client_phone': job.client_phone,
                     'date': job.scheduled_date.strftime('%b %d, %Y'),
                     'time': job.scheduled_time.strftime('%I:%M %p'),
                     'pickup': job.pickup_address,
                     'dropoff': job.dropoff_address,
                     'distance': job.distance_km,
-                    'items_count': job.total_volume * 2,  # Approximation
+                    'items_count': job.items_count,
                     'volume': job.total_volume,
                     'payment': job.total_price,
                     'status': job.status.value
                 }
                 for job in jobs
             ],
-            'total': len(jobs)
+            'total': len(jobs),
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
         }
         
         return jsonify(data), 200
@@ -168,3 +199,55 @@ def get_profile():
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/coverage', methods=['PUT'])
+@jwt_required()
+@role_required(['mover'])
+def update_coverage():
+    """Update mover base location, service radius and coverage zones"""
+    try:
+        user = get_current_user()
+        mover = user.mover_profile
+        
+        if not mover:
+            return jsonify({'error': 'Mover profile not found'}), 404
+        
+        data = request.get_json() or {}
+        cells = None
+        
+        zones = data.get('coverage_zones')
+        if zones is not None:
+            if not isinstance(zones, list) or not all(isinstance(zone, str) and zone.strip() for zone in zones):
+                return jsonify({'error': 'coverage_zones must be a list of zone names'}), 400
+            mover.coverage_zones = [zone.strip() for zone in zones]
+        
+        if zones is None or {'base_latitude', 'base_longitude', 'service_radius_km'} & data.keys():
+            try:
+                latitude = float(data.get('base_latitude', mover.base_latitude))
+                longitude = float(data.get('base_longitude', mover.base_longitude))
+                radius = float(data.get('service_radius_km', mover.service_radius_km or 30.0))
+            except (TypeError, ValueError):
+                return jsonify({'error': 'base_latitude, base_longitude and service_radius_km are required numbers'}), 400
+            
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                return jsonify({'error': 'Invalid coordinates'}), 400
+            if not (0 < radius <= current_app.config['MAX_SERVICE_RADIUS_KM']):
+                return jsonify({'error': 'Invalid service radius'}), 400
+            
+            mover.base_latitude = latitude
+            mover.base_longitude = longitude
+            mover.service_radius_km = radius
+            cells = mover.refresh_coverage_cells()
+        
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'Coverage updated successfully',
+            'coverage_cells': cells if cells is not None else mover.coverage_cells.count(),
+            'profile': mover.to_dict(include_user=True)
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,52 @@
+import threading
+import time
+
+class TTLCache:
+    """
+    Small thread-safe in-process cache with a per-entry time to live.
+    Each gunicorn worker holds its own copy, so keep TTLs short.
+    """
+    
+    def __init__(self, ttl=30, maxsize=1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        """Return cached value, or default if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            return value
+    
+    def set(self, key, value, ttl=None):
+        """Store value for ttl seconds (defaults to the cache TTL)"""
+        with self._lock:
+            if len(self._data) >= self.maxsize and key not in self._data:
+                self._evict()
+            self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+    
+    def invalidate(self, key):
+        """Drop a single key"""
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self):
+        """Drop every key"""
+        with self._lock:
+            self._data.clear()
+    
+    def _evict(self):
+        """Drop expired entries, then the entry closest to expiry"""
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._data.items() if expires_at < now]:
+            del self._data[key]
+        if len(self._data) >= self.maxsize:
+            oldest = min(self._data, key=lambda k: self._data[k][0])
+            del self._data[oldest]
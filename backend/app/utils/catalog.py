@@ -0,0 +1,70 @@
+import hashlib
+import json
+import threading
+import time
+from sqlalchemy import event
+from app import db
+from app.models import InventoryTemplate, RoomType
+
+class TemplateCatalog:
+    """
+    In-memory inventory template catalog grouped by room type.
+    Built on first use and rebuilt after templates change (or after
+    max_age seconds, to pick up edits made by other processes).
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._grouped = None
+        self._etag = None
+        self._built_at = 0.0
+        self.version = 0
+    
+    def get(self, max_age):
+        """Return (templates grouped by room type, etag)"""
+        with self._lock:
+            if self._grouped is None or time.monotonic() - self._built_at > max_age:
+                self._build()
+            return self._grouped, self._etag
+    
+    def invalidate(self):
+        """Force a rebuild on next use"""
+        with self._lock:
+            self._grouped = None
+    
+    def _build(self):
+        grouped = {}
+        templates = InventoryTemplate.query.order_by(InventoryTemplate.id).all()
+        for template in templates:
+            grouped.setdefault(template.room_type.value, []).append(template.to_dict())
+        
+        payload = json.dumps(grouped, sort_keys=True).encode('utf-8')
+        etag = hashlib.sha1(payload).hexdigest()
+        if etag != self._etag:
+            self.version += 1
+        
+        self._grouped = grouped
+        self._etag = etag
+        self._built_at = time.monotonic()
+
+template_catalog = TemplateCatalog()
+
+def get_room_templates(room_type, max_age):
+    """Templates for one RoomType (or all when None) plus a matching etag"""
+    grouped, etag = template_catalog.get(max_age)
+    if room_type is None:
+        return grouped, etag
+    room = RoomType(room_type).value
+    subset = {room: grouped[room]} if room in grouped else {}
+    return subset, f'{etag}-{room}'
+
+@event.listens_for(InventoryTemplate, 'after_insert')
+@event.listens_for(InventoryTemplate, 'after_update')
+@event.listens_for(InventoryTemplate, 'after_delete')
+def _templates_changed(mapper, connection, target):
+    db.session.info['templates_changed'] = True
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('templates_changed', False):
+        template_catalog.invalidate()
@@ -0,0 +1,11 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+
+def upsert(table):
+    """
+    Dialect-aware INSERT that supports on_conflict_do_update/do_nothing.
+    Production runs on PostgreSQL; SQLite is accepted for local tooling.
+    """
+    if db.engine.dialect.name == 'sqlite':
+        return sqlite.insert(table)
+    return postgresql.insert(table)
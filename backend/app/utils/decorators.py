@@ -1,7 +1,14 @@
 from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import get_jwt_identity
+from flask import jsonify, g, current_app
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload
+from app import db, jwt
 from app.models import User, UserRole
+from app.utils.cache import TTLCache
+
+# Process-level cache of {user_id: {'role', 'mover_id', 'is_active', 'token_version'}}
+role_cache = TTLCache()
 
 def role_required(allowed_roles):
     """
@@ -11,20 +18,109 @@ def role_required(allowed_roles):
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            user_id = get_jwt_identity()
-            user = User.query.get(user_id)
+            claims = get_auth_claims()
             
-            if not user:
+            if not claims:
                 return jsonify({'error': 'User not found'}), 404
             
-            if user.role.value not in allowed_roles:
+            if claims['role'] not in allowed_roles:
                 return jsonify({'error': 'Access denied. Insufficient permissions'}), 403
             
             return fn(*args, **kwargs)
         return wrapper
     return decorator
 
+def create_user_token(user):
+    """Create an access token carrying signed role and mover claims"""
+    return create_access_token(
+        identity=str(user.id),
+        additional_claims={
+            'role': user.role.value,
+            'mover_id': user.mover_profile.id if user.mover_profile else None,
+            'tv': user.token_version or 0
+        }
+    )
+
+def get_auth_claims():
+    """
+    Get user_id, role and mover_id for the current request.
+    Read from the token when present, so authorization needs no query;
+    tokens issued before claims were added fall back to the user record.
+    """
+    token = get_jwt()
+    user_id = int(get_jwt_identity())
+    
+    if 'role' in token:
+        return {'user_id': user_id, 'role': token['role'], 'mover_id': token.get('mover_id')}
+    
+    state = get_user_state(user_id)
+    if not state:
+        return None
+    return {'user_id': user_id, 'role': state['role'], 'mover_id': state['mover_id']}
+
+def get_user_state(user_id):
+    """Get role, active flag and token version for a user, from cache when possible"""
+    state = role_cache.get(str(user_id))
+    if state is None:
+        user = load_user(user_id)
+        if not user:
+            return None
+        state = {
+            'role': user.role.value,
+            'mover_id': user.mover_profile.id if user.mover_profile else None,
+            'is_active': user.is_active,
+            'token_version': user.token_version or 0
+        }
+        ttl = current_app.config['ROLE_CACHE_TTL']
+        if ttl:
+            role_cache.set(str(user_id), state, ttl=ttl)
+    return state
+
+def load_user(user_id):
+    """Load a user with mover profile, once per request"""
+    if 'current_user' not in g:
+        g.current_user = User.query.options(
+            joinedload(User.mover_profile)
+        ).get(int(user_id)) if user_id else None
+    return g.current_user
+
 def get_current_user():
     """Get current authenticated user"""
-    user_id = get_jwt_identity()
-    return User.query.get(user_id)
+    return load_user(get_jwt_identity())
+
+def invalidate_role_claims(user_id):
+    """Drop cached role claims for a user"""
+    role_cache.invalidate(str(user_id))
+
+@jwt.token_in_blocklist_loader
+def is_token_revoked(jwt_header, jwt_payload):
+    """Reject tokens for deleted or deactivated users, or with a stale version"""
+    state = get_user_state(jwt_payload['sub'])
+    if not state or not state['is_active']:
+        return True
+    return jwt_payload.get('tv', 0) != state['token_version']
+
+def invalidate_after_commit(user_id):
+    """Drop cached role claims for a user once the current transaction commits"""
+    db.session.info.setdefault('role_claims_changed', set()).add(user_id)
+
+@event.listens_for(User.role, 'set')
+@event.listens_for(User.is_active, 'set')
+@event.listens_for(User.token_version, 'set')
+def _role_claims_changed(user, value, old_value, initiator):
+    # Evicting before commit would let a concurrent request re-cache the old state
+    if user.id is not None and value != old_value:
+        invalidate_after_commit(user.id)
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, user):
+    invalidate_after_commit(user.id)
+
+@db.event.listens_for(db.session, 'after_commit')
+def _invalidate_after_commit(session):
+    for user_id in session.info.pop('role_claims_changed', ()):
+        invalidate_role_claims(user_id)
+
+@db.event.listens_for(db.session, 'after_rollback')
+def _keep_after_rollback(session):
+    session.info.pop('role_claims_changed', None)
@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+from flask import current_app
+from app.utils.geo import geohash_center, geohash_encode, haversine_km
+
+class DistanceEngine:
+    """
+    Road distance estimates: great-circle distance scaled by a road
+    circuity factor (ROAD_DISTANCE_FACTOR). Endpoints are snapped to geohash
+    cells (DISTANCE_CACHE_PRECISION, ~150 m at 7) so nearby requests share
+    one cached origin-destination pair in a bounded LRU.
+    """
+    
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._pairs = OrderedDict()
+        self._lock = threading.Lock()
+        self._metrics = {'hits': 0, 'misses': 0}
+    
+    def distance_km(self, origin, destination):
+        """Estimated road distance between two (lat, lng) points"""
+        precision = current_app.config['DISTANCE_CACHE_PRECISION']
+        return self._pair(geohash_encode(*origin, precision), geohash_encode(*destination, precision))
+    
+    def matrix(self, origins, destinations):
+        """Distances from every origin to every destination, as rows per origin"""
+        precision = current_app.config['DISTANCE_CACHE_PRECISION']
+        origin_cells = [geohash_encode(*point, precision) for point in origins]
+        destination_cells = [geohash_encode(*point, precision) for point in destinations]
+        return [[self._pair(a, b) for b in destination_cells] for a in origin_cells]
+    
+    def stats(self):
+        with self._lock:
+            data = dict(self._metrics)
+            data['size'] = len(self._pairs)
+        data['hit_rate'] = round(data['hits'] / max(data['hits'] + data['misses'], 1), 3)
+        return data
+    
+    def clear(self):
+        with self._lock:
+            self._pairs.clear()
+    
+    def _pair(self, origin_cell, destination_cell):
+        # Road distance is treated as symmetric, so A->B and B->A share an entry
+        key = (origin_cell, destination_cell) if origin_cell <= destination_cell else (destination_cell, origin_cell)
+        with self._lock:
+            distance = self._pairs.get(key)
+            if distance is not None:
+                self._pairs.move_to_end(key)
+                self._metrics['hits'] += 1
+                return distance
+            self._metrics['misses'] += 1
+        
+        if origin_cell == destination_cell:
+            distance = 0.0
+        else:
+            distance = round(
+                haversine_km(*geohash_center(origin_cell), *geohash_center(destination_cell))
+                * current_app.config['ROAD_DISTANCE_FACTOR'], 2
+            )
+        
+        with self._lock:
+            self._pairs[key] = distance
+            if len(self._pairs) > self.maxsize:
+                self._pairs.popitem(last=False)
+        return distance
+
+
+distance_engine = DistanceEngine()
+
+def parse_point(data, prefix=None):
+    """(lat, lng) from latitude/longitude (or {prefix}_latitude/...), None if absent"""
+    key = f'{prefix}_' if prefix else ''
+    lat, lng = data.get(f'{key}latitude'), data.get(f'{key}longitude')
+    if lat is None or lng is None:
+        return None
+    lat, lng = float(lat), float(lng)
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError('Invalid coordinates')
+    return lat, lng
+
+def resolve_distance(data, allow_client_distance=True):
+    """
+    Trip distance for a quote or booking: computed from pickup/dropoff
+    coordinates when both are given, else (for quotes only) the client's
+    distance_km. Returns None when neither is available.
+    """
+    pickup, dropoff = parse_point(data, 'pickup'), parse_point(data, 'dropoff')
+    if pickup and dropoff:
+        return distance_engine.distance_km(pickup, dropoff)
+    if allow_client_distance and data.get('distance_km') is not None:
+        return float(data['distance_km'])
+    return None
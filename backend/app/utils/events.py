@@ -0,0 +1,133 @@
+import json
+import queue
+import threading
+from importlib import import_module
+from app import db
+
+class Subscription:
+    """A subscriber's bounded event queue; the oldest events are dropped on overflow"""
+    
+    def __init__(self, broker, topic, maxsize):
+        self.broker = broker
+        self.topic = topic
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=maxsize)
+    
+    def put(self, event):
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+    
+    def get(self, timeout=None):
+        """Next event, or None once timeout seconds pass without one"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    
+    def drain(self):
+        """Every event already queued, without waiting"""
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                return events
+    
+    def close(self):
+        self.broker.unsubscribe(self)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LocalBroker:
+    """
+    In-process topic fan-out. One publish reaches every subscriber of the
+    topic held by this worker process; deployments running several workers
+    should plug in a shared broker with the same interface (TRACKING_BROKER).
+    """
+    
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._topics = {}
+        self._lock = threading.Lock()
+    
+    def subscribe(self, topic):
+        subscription = Subscription(self, topic, self.max_queue)
+        with self._lock:
+            self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._topics.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._topics[subscription.topic]
+    
+    def publish(self, topic, event):
+        """Deliver event to the topic's subscribers; returns how many received it"""
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+        for subscription in subscribers:
+            subscription.put(event)
+        return len(subscribers)
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'topics': len(self._topics),
+                'subscribers': sum(len(subscribers) for subscribers in self._topics.values()),
+            }
+
+
+broker = LocalBroker()
+
+def init_app(app):
+    """Install the broker class named by TRACKING_BROKER (dotted path)"""
+    global broker
+    path = app.config.get('TRACKING_BROKER') or 'app.utils.events.LocalBroker'
+    module_name, class_name = path.rsplit('.', 1)
+    broker_class = getattr(import_module(module_name), class_name)
+    if not isinstance(broker, broker_class):
+        broker = broker_class(max_queue=app.config.get('TRACKING_QUEUE_SIZE', 100))
+
+def get_broker():
+    return broker
+
+def booking_topic(booking_id):
+    return f'booking:{booking_id}'
+
+def publish_after_commit(topic, event):
+    """Queue an event to be published once the current transaction commits"""
+    db.session.info.setdefault('pending_events', []).append((topic, event))
+
+def format_sse(event):
+    """Encode an event dict ({'id', 'type', 'data'}) as a Server-Sent Events frame"""
+    lines = []
+    if event.get('id') is not None:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['type']}")
+    lines.append(f"data: {json.dumps(event['data'], separators=(',', ':'))}")
+    return '\n'.join(lines) + '\n\n'
+
+@db.event.listens_for(db.session, 'after_commit')
+def _publish_after_commit(session):
+    for topic, event in session.info.pop('pending_events', []):
+        broker.publish(topic, event)
+
+@db.event.listens_for(db.session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('pending_events', None)
@@ -0,0 +1,112 @@
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_DECODE = {char: index for index, char in enumerate(_BASE32)}
+
+# Coverage cells are stored at this precision (~4.9 km x 4.9 km at the equator)
+COVERAGE_PRECISION = 5
+
+def normalize_zone(zone):
+    """Canonical form of a zone name for matching (case-insensitive)"""
+    return zone.strip().lower() if zone and zone.strip() else None
+
+def home_zone(coverage_zones):
+    """A mover's home zone: the first valid name in its coverage_zones"""
+    for zone in coverage_zones or []:
+        if isinstance(zone, str) and normalize_zone(zone):
+            return normalize_zone(zone)
+    return None
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in kilometers"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def geohash_encode(lat, lng, precision=COVERAGE_PRECISION):
+    """Encode a point as a geohash string"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if lng >= mid:
+                value = (value << 1) | 1
+                lng_range[0] = mid
+            else:
+                value <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if lat >= mid:
+                value = (value << 1) | 1
+                lat_range[0] = mid
+            else:
+                value <<= 1
+                lat_range[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return ''.join(chars)
+
+def geohash_bounds(geohash):
+    """(min_lat, min_lng, max_lat, max_lng) of a geohash cell"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            target = lng_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            target[1 - bit] = mid
+            even = not even
+    return lat_range[0], lng_range[0], lat_range[1], lng_range[1]
+
+def geohash_center(geohash):
+    """(lat, lng) of a geohash cell's center"""
+    min_lat, min_lng, max_lat, max_lng = geohash_bounds(geohash)
+    return (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+
+def cell_size(precision=COVERAGE_PRECISION):
+    """(lat degrees, lng degrees) spanned by a cell at this precision"""
+    total_bits = precision * 5
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+def covering_cells(lat, lng, radius_km, precision=COVERAGE_PRECISION):
+    """Geohash cells at the given precision that intersect a circle"""
+    lat_step, lng_step = cell_size(precision)
+    d_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    d_lng = min(180.0, d_lat / cos_lat)
+    
+    cells = set()
+    y = max(-90.0, lat - d_lat)
+    while y <= min(90.0, lat + d_lat) + lat_step:
+        x = lng - d_lng
+        while x <= lng + d_lng + lng_step:
+            wrapped = (x + 180.0) % 360.0 - 180.0
+            cell = geohash_encode(min(y, 89.999999), wrapped, precision)
+            if cell not in cells:
+                min_lat, min_lng, max_lat, max_lng = geohash_bounds(cell)
+                # Nearest point of the cell to the center
+                near_lat = min(max(lat, min_lat), max_lat)
+                near_lng = min(max(lng, min_lng), max_lng)
+                if haversine_km(lat, lng, near_lat, near_lng) <= radius_km:
+                    cells.add(cell)
+            x += lng_step
+        y += lat_step
+    return cells
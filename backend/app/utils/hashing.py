@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+import bcrypt
+from flask import current_app
+
+class HashingPoolBusy(Exception):
+    """Raised when too many hashing jobs are already queued"""
+    pass
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+def _check(password_hash, password):
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+class HashingPool:
+    """
+    Runs bcrypt in a bounded process pool so request workers are not pinned
+    by CPU-bound hashing. With zero workers, hashing runs inline.
+    """
+    
+    def __init__(self):
+        self._executor = None
+        self._pid = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._metrics = {
+            'submitted': 0,
+            'completed': 0,
+            'timed_out': 0,
+            'failed': 0,
+            'rejected': 0,
+            'in_flight': 0,
+            'total_seconds': 0.0
+        }
+    
+    def hash(self, password):
+        return self._run(_hash, password, current_app.config['BCRYPT_LOG_ROUNDS'])
+    
+    def check(self, password_hash, password):
+        return self._run(_check, password_hash, password)
+    
+    def stats(self):
+        """Snapshot of pool counters"""
+        with self._lock:
+            data = dict(self._metrics)
+        data['avg_ms'] = round(data.pop('total_seconds') / max(data['completed'], 1) * 1000, 2)
+        data['workers'] = current_app.config['BCRYPT_POOL_WORKERS']
+        data['max_pending'] = current_app.config['BCRYPT_POOL_MAX_PENDING']
+        return data
+    
+    def _run(self, fn, *args):
+        config = current_app.config
+        slots = self._get_slots(config['BCRYPT_POOL_MAX_PENDING'])
+        if not slots.acquire(blocking=False):
+            self._count('rejected')
+            raise HashingPoolBusy('Too many authentication requests, please retry')
+        
+        self._count('submitted', 'in_flight')
+        started = time.monotonic()
+        try:
+            executor = self._get_executor(config['BCRYPT_POOL_WORKERS'])
+            future = executor.submit(fn, *args) if executor is not None else None
+        except Exception:
+            self._release(slots)
+            self._count('failed')
+            raise
+        
+        if future is None:
+            try:
+                result = fn(*args)
+            except Exception:
+                self._count('failed')
+                raise
+            finally:
+                self._release(slots)
+            self._completed(started)
+            return result
+        
+        # The slot stays taken until the job leaves the pool, even if we stop
+        # waiting, so BCRYPT_POOL_MAX_PENDING bounds the real queue depth
+        future.add_done_callback(lambda _: self._release(slots))
+        try:
+            result = future.result(timeout=config['BCRYPT_POOL_TIMEOUT'])
+        except FutureTimeoutError:
+            future.cancel()  # frees the slot now if the job has not started
+            self._count('timed_out')
+            raise HashingPoolBusy('Authentication timed out, please retry')
+        except Exception:
+            self._count('failed')
+            raise
+        self._completed(started)
+        return result
+    
+    def _release(self, slots):
+        slots.release()
+        with self._lock:
+            self._metrics['in_flight'] -= 1
+    
+    def _completed(self, started):
+        with self._lock:
+            self._metrics['completed'] += 1
+            self._metrics['total_seconds'] += time.monotonic() - started
+    
+    def _count(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._metrics[key] += 1
+    
+    def _get_slots(self, max_pending):
+        with self._lock:
+            if self._slots is None:
+                self._slots = threading.BoundedSemaphore(max_pending)
+            return self._slots
+    
+    def _get_executor(self, workers):
+        if not workers:
+            return None
+        with self._lock:
+            # Pools do not survive a fork, so each gunicorn worker builds its own
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=workers)
+                self._pid = os.getpid()
+            return self._executor
+
+hash_pool = HashingPool()
+
+def hash_password(password):
+    """Hash a password off-thread with the configured work factor"""
+    return hash_pool.hash(password)
+
+def verify_password(password_hash, password):
+    """Check a password against a bcrypt hash off-thread"""
+    return hash_pool.check(password_hash, password)
+
+def hash_cost(password_hash):
+    """Work factor encoded in a bcrypt hash ($2b$<cost>$...)"""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
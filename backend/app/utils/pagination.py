@@ -0,0 +1,54 @@
+import base64
+from datetime import datetime
+from sqlalchemy import Date, tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def get_page_size(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Parse a ?limit= value and clamp it to the hard page cap"""
+    try:
+        size = int(value) if value is not None else default
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    return max(1, min(size, maximum))
+
+def encode_cursor(timestamp, row_id):
+    """Encode a (timestamp, id) keyset position as an opaque cursor"""
+    raw = f'{timestamp.isoformat()}|{row_id}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        timestamp, row_id = raw.split('|')
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, UnicodeError):
+        raise ValueError('Invalid cursor')
+
+def keyset_page(query, timestamp_column, id_column, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Fetch one page ordered newest first using keyset pagination.
+    timestamp_column may be a DateTime or Date column; rows may be entities
+    or column tuples that include both columns.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        if isinstance(timestamp_column.type, Date):
+            timestamp = timestamp.date()
+        query = query.filter(tuple_(timestamp_column, id_column) < tuple_(timestamp, row_id))
+    
+    rows = query.order_by(timestamp_column.desc(), id_column.desc()).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            getattr(last, timestamp_column.key),
+            getattr(last, id_column.key)
+        )
+    
+    return rows, next_cursor
@@ -0,0 +1,271 @@
+import threading
+import time
+from bisect import bisect_left
+import numpy as np
+from flask import current_app
+from sqlalchemy import event
+from app import db
+from app.models import Mover, PricingRule, PricingRuleType
+from app.utils.geo import home_zone, normalize_zone
+
+# Used when no pricing rule in the database covers a mover/zone
+DEFAULT_LABOR_TIERS = [(5, 1000), (10, 2000), (None, 3000)]  # (max volume, cost)
+DEFAULT_PACKING_RATE = 100  # per cubic meter
+DEFAULT_SERVICE_FEE = (0, False)  # (value, is_percentage): free for clients
+
+class CompiledRules:
+    """Flat, query-free pricing parameters for one (mover, zone) scope"""
+    __slots__ = ('labor_bounds', 'labor_costs', 'labor_default', 'packing_rate', 'fee_value', 'fee_is_percentage')
+    
+    def __init__(self, labor_tiers, packing_rate, service_fee):
+        bounded = sorted((bound, cost) for bound, cost in labor_tiers if bound is not None)
+        open_ended = [cost for bound, cost in labor_tiers if bound is None]
+        self.labor_bounds = tuple(bound for bound, _ in bounded)
+        self.labor_costs = tuple(cost for _, cost in bounded)
+        self.labor_default = open_ended[0] if open_ended else (self.labor_costs[-1] if bounded else 0)
+        self.packing_rate = packing_rate
+        self.fee_value, self.fee_is_percentage = service_fee
+    
+    def labor_cost(self, total_volume):
+        index = bisect_left(self.labor_bounds, total_volume)
+        return self.labor_costs[index] if index < len(self.labor_costs) else self.labor_default
+    
+    def service_fee(self, subtotal):
+        return subtotal * self.fee_value / 100 if self.fee_is_percentage else self.fee_value
+
+class RuleSet:
+    """Pricing rules grouped by scope, resolved per (mover, zone) on first use"""
+    
+    def __init__(self, rules):
+        self._scopes = {}
+        for rule in rules:
+            scope = self._scopes.setdefault((rule.mover_id, rule.zone), {})
+            if rule.rule_type == PricingRuleType.LABOR_TIER:
+                scope.setdefault('labor', []).append((rule.max_volume, rule.value))
+            elif rule.rule_type == PricingRuleType.PACKING_RATE:
+                scope['packing'] = rule.value
+            elif rule.rule_type == PricingRuleType.SERVICE_FEE:
+                scope['fee'] = (rule.value, bool(rule.is_percentage))
+        self._resolved = {}
+    
+    def resolve(self, mover_id, zone=None):
+        key = (mover_id, zone)
+        compiled = self._resolved.get(key)
+        if compiled is None:
+            compiled = self._resolved[key] = CompiledRules(
+                self._lookup(mover_id, zone, 'labor', DEFAULT_LABOR_TIERS),
+                self._lookup(mover_id, zone, 'packing', DEFAULT_PACKING_RATE),
+                self._lookup(mover_id, zone, 'fee', DEFAULT_SERVICE_FEE)
+            )
+        return compiled
+    
+    def _lookup(self, mover_id, zone, kind, default):
+        for scope in ((mover_id, zone), (mover_id, None), (None, zone), (None, None)):
+            rules = self._scopes.get(scope)
+            if rules and kind in rules:
+                return rules[kind]
+        return default
+
+class PricingEngine:
+    """
+    Holds the compiled rule set in memory. Rebuilt after pricing rules are
+    committed, or after PRICING_RULES_MAX_AGE seconds so edits made by other
+    processes are picked up.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rule_set = None
+        self._built_at = 0.0
+        self.version = 0
+    
+    def rules_for(self, mover_id, zone=None):
+        return self.rule_set().resolve(mover_id, normalize_zone(zone))
+    
+    def rule_set(self):
+        max_age = current_app.config['PRICING_RULES_MAX_AGE']
+        rule_set = self._rule_set
+        if rule_set is None or time.monotonic() - self._built_at > max_age:
+            with self._lock:
+                # Another request may have reloaded while we waited for the lock
+                rule_set = self._rule_set
+                if rule_set is None or time.monotonic() - self._built_at > max_age:
+                    rules = PricingRule.query.filter(PricingRule.is_active.is_(True)).all()
+                    rule_set = self._rule_set = RuleSet(rules)
+                    self._built_at = time.monotonic()
+                    self.version += 1
+        return rule_set
+    
+    def invalidate(self):
+        with self._lock:
+            self._rule_set = None
+
+pricing_engine = PricingEngine()
+
+def calculate_pricing(distance_km, total_volume, mover):
+    """
+    Calculate booking price. Zone-scoped rules follow the mover's home zone,
+    never a zone named by the client.
+    """
+    rules = pricing_engine.rules_for(mover.id, mover.pricing_zone)
+    
+    base_price = distance_km * mover.base_price_per_km
+    volume_price = total_volume * mover.price_per_cubic_meter
+    labor_cost = rules.labor_cost(total_volume)
+    packing_cost = total_volume * rules.packing_rate
+    service_fee = rules.service_fee(base_price + volume_price + labor_cost + packing_cost)
+    
+    total = base_price + volume_price + labor_cost + packing_cost + service_fee
+    
+    return {
+        'base_price': round(base_price, 2),
+        'labor_cost': round(labor_cost, 2),
+        'packing_materials_cost': round(packing_cost, 2),
+        'service_fee': round(service_fee, 2),
+        'total_price': round(total, 2)
+    }
+
+class MoverPriceTable:
+    """
+    Column arrays of approved, available movers' rates, held in memory so
+    every mover can be priced in one vectorized pass. Rebuilt after mover
+    changes are committed, or after max_age seconds.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._table = None
+        self._built_at = 0.0
+    
+    def get(self, max_age):
+        with self._lock:
+            if self._table is None or time.monotonic() - self._built_at > max_age:
+                self._table = self._build()
+                self._built_at = time.monotonic()
+            return self._table
+    
+    def invalidate(self):
+        with self._lock:
+            self._table = None
+    
+    def _build(self):
+        rows = db.session.query(
+            Mover.id,
+            Mover.company_name,
+            Mover.rating,
+            Mover.vehicle_capacity,
+            Mover.base_price_per_km,
+            Mover.price_per_cubic_meter,
+            Mover.coverage_zones
+        ).filter(
+            Mover.is_approved.is_(True),
+            Mover.is_available.is_(True)
+        ).order_by(Mover.id).all()
+        
+        return {
+            'ids': np.array([row.id for row in rows], dtype=np.int64),
+            'names': [row.company_name for row in rows],
+            'ratings': np.array([row.rating or 0.0 for row in rows], dtype=np.float64),
+            # No recorded capacity means no limit, as in create_booking's check
+            'capacity': np.array([np.inf if row.vehicle_capacity is None else row.vehicle_capacity for row in rows], dtype=np.float64),
+            'per_km': np.array([row.base_price_per_km or 0.0 for row in rows], dtype=np.float64),
+            'per_m3': np.array([row.price_per_cubic_meter or 0.0 for row in rows], dtype=np.float64),
+            'zones': [home_zone(row.coverage_zones) for row in rows]
+        }
+
+mover_price_table = MoverPriceTable()
+
+def price_all_movers(trips, max_age, limit=None, table=None):
+    """
+    Price every eligible mover for each (distance_km, total_volume) trip,
+    applying each mover's home-zone rules. Movers whose vehicle capacity is
+    below a trip's volume are left out of that trip's quotes.
+    Returns, per trip, quotes ranked by total price. table overrides the
+    cached mover price table (used by the benchmark).
+    """
+    if table is None:
+        table = mover_price_table.get(max_age)
+    rule_set = pricing_engine.rule_set()
+    rules = [rule_set.resolve(int(mover_id), zone) for mover_id, zone in zip(table['ids'], table['zones'])]
+    
+    distances = np.array([trip[0] for trip in trips], dtype=np.float64)[:, None]
+    volumes = np.array([trip[1] for trip in trips], dtype=np.float64)[:, None]
+    
+    base = distances * table['per_km']
+    volume_price = volumes * table['per_m3']
+    packing = volumes * np.array([r.packing_rate for r in rules], dtype=np.float64)
+    
+    # Movers sharing a compiled rule set share one labor tier evaluation
+    labor = np.empty_like(base)
+    groups = {}
+    for column, compiled in enumerate(rules):
+        groups.setdefault(id(compiled), (compiled, []))[1].append(column)
+    for compiled, columns in groups.values():
+        if not compiled.labor_bounds:
+            labor[:, columns] = compiled.labor_default
+            continue
+        labor[:, columns] = np.select(
+            [volumes <= bound for bound in compiled.labor_bounds],
+            list(compiled.labor_costs),
+            default=compiled.labor_default
+        ).astype(np.float64)
+    
+    subtotal = base + volume_price + labor + packing
+    fee_values = np.array([r.fee_value for r in rules], dtype=np.float64)
+    fee_is_percentage = np.array([r.fee_is_percentage for r in rules], dtype=bool)
+    service_fee = np.where(fee_is_percentage, subtotal * fee_values / 100, np.broadcast_to(fee_values, subtotal.shape))
+    total = base + volume_price + labor + packing + service_fee
+    
+    # Ineligible movers sort last and are cut off per trip
+    eligible = volumes <= table['capacity']
+    order = np.argsort(np.where(eligible, total, np.inf), axis=1, kind='stable')
+    counts = eligible.sum(axis=1)
+    if limit:
+        counts = np.minimum(counts, limit)
+    
+    results = []
+    for i, (distance_km, total_volume) in enumerate(trips):
+        quotes = []
+        for rank, j in enumerate(order[i, :counts[i]], start=1):
+            quotes.append({
+                'rank': rank,
+                'mover_id': int(table['ids'][j]),
+                'company_name': table['names'][j],
+                'rating': round(float(table['ratings'][j]), 1),
+                'vehicle_capacity': float(table['capacity'][j]) if np.isfinite(table['capacity'][j]) else None,
+                'estimate': {
+                    'base_price': round(float(base[i, j]), 2),
+                    'labor_cost': round(float(labor[i, j]), 2),
+                    'packing_materials_cost': round(float(packing[i, j]), 2),
+                    'service_fee': round(float(service_fee[i, j]), 2),
+                    'total_price': round(float(total[i, j]), 2)
+                }
+            })
+        results.append({
+            'distance_km': distance_km,
+            'total_volume': total_volume,
+            'quotes': quotes
+        })
+    return results
+
+@event.listens_for(Mover, 'after_insert')
+@event.listens_for(Mover, 'after_update')
+@event.listens_for(Mover, 'after_delete')
+def _movers_changed(mapper, connection, target):
+    db.session.info['movers_changed'] = True
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('movers_changed', False):
+        mover_price_table.invalidate()
+
+@event.listens_for(PricingRule, 'after_insert')
+@event.listens_for(PricingRule, 'after_update')
+@event.listens_for(PricingRule, 'after_delete')
+def _rules_changed(mapper, connection, target):
+    db.session.info['pricing_rules_changed'] = True
+
+@event.listens_for(db.session, 'after_commit')
+def _reload_rules_after_commit(session):
+    if session.info.pop('pricing_rules_changed', False):
+        pricing_engine.invalidate()
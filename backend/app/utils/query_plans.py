@@ -0,0 +1,168 @@
+from datetime import date
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+from app import db
+from app.models import (
+    Booking, BookingStatus, BookingStatusUpdate, Review, User, UserRole, UserInventory, RoomType
+)
+
+# Tables large enough in production that a sequential scan is a regression
+HOT_TABLES = {'bookings', 'booking_status_updates', 'reviews', 'user_inventories'}
+
+# Cost growth below this is planner noise on cheap queries, not a regression
+MIN_COST_SLACK = 10.0
+
+def _enum_literal(column, member):
+    """SQL literal for a stored enum member, cast to the column's enum type"""
+    return f"'{member.name}'::{column.type.name}"
+
+def seed_synthetic(bookings=200000, movers=200, clients=20000):
+    """
+    Insert a synthetic dataset with set-based SQL in the current transaction
+    (PostgreSQL). The caller is expected to roll it back.
+    """
+    status = Booking.__table__.c.status
+    role = User.__table__.c.role
+    statements = [
+        f"""
+        INSERT INTO users (email, password_hash, full_name, phone_number, role, is_active, is_verified,
+                           token_version, created_at, updated_at)
+        SELECT 'plan-' || g || '@example.invalid', '-', 'Plan User ' || g, '0700000000',
+               CASE WHEN g <= :movers THEN {_enum_literal(role, UserRole.MOVER)}
+                    ELSE {_enum_literal(role, UserRole.CLIENT)} END,
+               true, false, 0, now(), now()
+        FROM generate_series(1, :movers + :clients) g
+        """,
+        f"""
+        INSERT INTO movers (user_id, company_name, vehicle_capacity, base_price_per_km, price_per_cubic_meter,
+                            is_approved, is_available, rating, total_jobs_completed, review_count, rating_sum,
+                            created_at, updated_at)
+        SELECT id, 'Plan Movers ' || id, 20, 100, 500, true, true, 0, 0, 0, 0, now(), now()
+        FROM users WHERE email LIKE 'plan-%@example.invalid' AND role = {_enum_literal(role, UserRole.MOVER)}
+        """,
+        f"""
+        INSERT INTO bookings (booking_reference, client_id, mover_id, status, pickup_address, dropoff_address,
+                              scheduled_date, scheduled_time, distance_km, total_volume, base_price, labor_cost,
+                              packing_materials_cost, service_fee, total_price, created_at, updated_at)
+        SELECT 'PLAN-' || g,
+               c.ids[1 + g % array_length(c.ids, 1)],
+               m.ids[1 + (g * 7) % array_length(m.ids, 1)],
+               CASE g % 20 WHEN 0 THEN {_enum_literal(status, BookingStatus.PENDING)}
+                           WHEN 1 THEN {_enum_literal(status, BookingStatus.CONFIRMED)}
+                           WHEN 2 THEN {_enum_literal(status, BookingStatus.IN_PROGRESS)}
+                           WHEN 3 THEN {_enum_literal(status, BookingStatus.CANCELLED)}
+                           ELSE {_enum_literal(status, BookingStatus.COMPLETED)} END,
+               'Pickup ' || g, 'Dropoff ' || g,
+               current_date + 30 - (g % 1095), time '09:00',
+               10, 8, 1000, 2000, 500, 0, 3500,
+               now() - g * interval '5 minutes', now()
+        FROM generate_series(1, :bookings) g,
+             (SELECT array_agg(id) AS ids FROM users
+              WHERE email LIKE 'plan-%@example.invalid' AND role = {_enum_literal(role, UserRole.CLIENT)}) c,
+             (SELECT array_agg(m.id) AS ids FROM movers m JOIN users u ON u.id = m.user_id
+              WHERE u.email LIKE 'plan-%@example.invalid') m
+        """,
+        """
+        INSERT INTO booking_status_updates (booking_id, status, updated_by, created_at)
+        SELECT b.id, 'Update ' || s, b.client_id, b.created_at + s * interval '1 hour'
+        FROM bookings b CROSS JOIN generate_series(1, 3) s
+        WHERE b.booking_reference LIKE 'PLAN-%'
+        """,
+        f"""
+        INSERT INTO reviews (booking_id, client_id, mover_id, rating, created_at, updated_at)
+        SELECT id, client_id, mover_id, 1 + id % 5, created_at + interval '1 day', now()
+        FROM bookings
+        WHERE booking_reference LIKE 'PLAN-%' AND status = {_enum_literal(status, BookingStatus.COMPLETED)}
+        """,
+        f"""
+        INSERT INTO user_inventories (user_id, room_type, created_at, updated_at)
+        SELECT client_id, {_enum_literal(UserInventory.__table__.c.room_type, RoomType.ONE_BR)}, created_at, now()
+        FROM bookings WHERE booking_reference LIKE 'PLAN-%' AND id % 4 = 0
+        """,
+        'ANALYZE users, movers, bookings, booking_status_updates, reviews, user_inventories',
+    ]
+    params = {'bookings': bookings, 'movers': movers, 'clients': clients}
+    for statement in statements:
+        db.session.execute(text(statement), params)
+
+def hot_queries():
+    """Route queries worth guarding, keyed by name, against synthetic ids"""
+    sample = db.session.execute(
+        select(Booking.id, Booking.client_id, Booking.mover_id).where(Booking.booking_reference == 'PLAN-1')
+    ).one()
+    booking_id, client_id, mover_id = sample
+    today = date.today()
+    open_statuses = [BookingStatus.CONFIRMED, BookingStatus.IN_PROGRESS]
+    
+    return {
+        'mover_jobs': select(Booking.id, Booking.scheduled_date).where(
+            Booking.mover_id == mover_id
+        ).order_by(Booking.scheduled_date.desc(), Booking.id.desc()).limit(50),
+        'mover_jobs_by_status': select(Booking.id, Booking.scheduled_date).where(
+            Booking.mover_id == mover_id,
+            Booking.status == BookingStatus.COMPLETED
+        ).order_by(Booking.scheduled_date.desc()).limit(50),
+        'mover_upcoming_jobs': select(Booking.id).where(
+            Booking.mover_id == mover_id,
+            Booking.status.in_(open_statuses),
+            Booking.scheduled_date >= today
+        ).order_by(Booking.scheduled_date, Booking.scheduled_time).limit(5),
+        'client_upcoming_booking': select(Booking.id).where(
+            Booking.client_id == client_id,
+            Booking.status == BookingStatus.CONFIRMED,
+            Booking.scheduled_date >= today
+        ).order_by(Booking.scheduled_date).limit(1),
+        'client_completed_count': select(func.count()).select_from(Booking).where(
+            Booking.client_id == client_id,
+            Booking.status == BookingStatus.COMPLETED
+        ),
+        'admin_bookings_page': select(Booking.id).order_by(
+            Booking.created_at.desc(), Booking.id.desc()
+        ).limit(50),
+        'tracking_updates': select(BookingStatusUpdate.id).where(
+            BookingStatusUpdate.booking_id == booking_id
+        ).order_by(BookingStatusUpdate.created_at, BookingStatusUpdate.id),
+        'mover_recent_reviews': select(Review.id).where(
+            Review.mover_id == mover_id
+        ).order_by(Review.created_at.desc()).limit(5),
+        'client_inventories': select(UserInventory.id).where(UserInventory.user_id == client_id),
+    }
+
+def explain(statement):
+    """Plan (EXPLAIN FORMAT JSON root node) of a statement"""
+    sql = statement.compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True})
+    return db.session.execute(text(f'EXPLAIN (FORMAT JSON) {sql}')).scalar()[0]['Plan']
+
+def plan_nodes(plan):
+    """Every node of a plan tree, depth first"""
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+def check_plans(baseline=None, tolerance=1.5):
+    """
+    EXPLAIN every hot query. Returns a list of result dicts with the plan's
+    total cost, scanned relations and any problems found.
+    """
+    results = []
+    for name, statement in hot_queries().items():
+        plan = explain(statement)
+        nodes = list(plan_nodes(plan))
+        problems = [
+            f"sequential scan on {node['Relation Name']}"
+            for node in nodes
+            if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in HOT_TABLES
+        ]
+        cost = plan['Total Cost']
+        if baseline and name in baseline and cost > max(baseline[name] * tolerance, baseline[name] + MIN_COST_SLACK):
+            problems.append(f'cost {cost:.1f} exceeds baseline {baseline[name]:.1f} x {tolerance}')
+        results.append({
+            'name': name,
+            'cost': cost,
+            'scans': sorted({
+                f"{node['Node Type']}({node.get('Index Name') or node['Relation Name']})"
+                for node in nodes if 'Relation Name' in node or 'Index Name' in node
+            }),
+            'problems': problems,
+        })
+    return results
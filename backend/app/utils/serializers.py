@@ -0,0 +1,253 @@
+import json
+import orjson
+from datetime import date, datetime, time
+from enum import Enum
+from operator import attrgetter, itemgetter
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import inspect
+from app.models import Booking, Mover, User, UserRole
+
+# Returned by a computed field to leave its key out of the output
+OMIT = object()
+
+class Serializer:
+    """
+    Turns model instances into plain dicts from a field list compiled once.
+    A field is a column/attribute name, a (key, attribute) pair to rename,
+    or a (key, callable) pair computed from the instance; a callable may
+    return OMIT to leave the key out. Dates, times and enums are left as-is
+    for the JSON encoder to write directly.
+    """
+    
+    def __init__(self, model, fields, mirrors=None):
+        self.model = model
+        self.fields = fields
+        self.mirrors = mirrors  # the to_dict call this plan must match (see check_parity)
+        self._plan = None
+    
+    def compile(self):
+        """
+        Resolve the field list into C-level getters plus computed fields.
+        Loaded column values are read straight from the instance __dict__,
+        skipping the ORM descriptors; anything unloaded goes through them.
+        """
+        attributes = inspect(self.model).all_orm_descriptors
+        keys, names, computed = [], [], []
+        for field in self.fields:
+            key, source = field if isinstance(field, tuple) else (field, field)
+            if callable(source):
+                computed.append((key, source))
+            elif source in attributes:
+                keys.append(key)
+                names.append(source)
+            else:
+                raise ValueError(f'{self.model.__name__} has no attribute {source!r}')
+        self._plan = (tuple(keys), _tuple_getter(itemgetter, names), _tuple_getter(attrgetter, names), tuple(computed))
+        return self
+    
+    def one(self, obj):
+        if obj is None:
+            return None
+        if self._plan is None:
+            self.compile()
+        keys, loaded, attributes, computed = self._plan
+        try:
+            values = loaded(obj.__dict__)
+        except KeyError:
+            values = attributes(obj)
+        data = dict(zip(keys, values))
+        for key, compute in computed:
+            value = compute(obj)
+            if value is not OMIT:
+                data[key] = value
+        return data
+    
+    def many(self, objs):
+        return [self.one(obj) for obj in objs]
+
+
+def _tuple_getter(getter, names):
+    """itemgetter/attrgetter return a bare value for one name; keep the tuple shape"""
+    if len(names) > 1:
+        return getter(*names)
+    if not names:
+        return lambda obj: ()
+    get = getter(names[0])
+    return lambda obj: (get(obj),)
+
+registry = {}
+
+def register(name, model, fields, mirrors=None):
+    registry[name] = Serializer(model, fields, mirrors)
+    return registry[name]
+
+def get_serializer(name):
+    return registry[name]
+
+def serialize(name, objs):
+    """Serialize one instance or a list of instances with a registered plan"""
+    serializer = registry[name]
+    if isinstance(objs, (list, tuple)):
+        return serializer.many(objs)
+    return serializer.one(objs)
+
+def nested(name, attribute):
+    """Computed field serializing a related instance with another registered plan, omitted when unset"""
+    get = attrgetter(attribute)
+    
+    def compute(obj):
+        related = get(obj)
+        return OMIT if related is None else registry[name].one(related)
+    return compute
+
+def related_field(relation, attribute):
+    """Computed field reading one attribute of a related instance, omitted when unset"""
+    get = attrgetter(relation)
+    
+    def compute(obj):
+        related = get(obj)
+        return OMIT if related is None else getattr(related, attribute)
+    return compute
+
+
+def dumps_bytes(obj, sort_keys=False, indent=False, default=None):
+    """Encode obj to JSON bytes; dates, times, datetimes and enums are written natively"""
+    # Pricing math can hand back numpy scalars, which json accepted as floats
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=default, option=option)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson. Datetimes are written as ISO 8601 like
+    the models' to_dict output; other types fall back to Flask's default.
+    """
+    
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps_bytes(obj, sort_keys=self.sort_keys, default=self.default).decode()
+    
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = dumps_bytes(obj, sort_keys=self.sort_keys, indent=indent, default=self.default)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+# Plans mirroring the models' to_dict output for the large listings. Keep
+# each in step with its to_dict; flask serialize check reports drift.
+
+register('user.contact', User, [
+    'id',
+    ('name', 'full_name'),
+    'email',
+    ('phone', 'phone_number'),
+])
+
+register('mover', Mover, [
+    'id', 'company_name', 'registration_number', 'vehicle_type', 'vehicle_capacity', 'coverage_zones',
+    'base_latitude', 'base_longitude', 'service_radius_km', 'base_price_per_km', 'price_per_cubic_meter',
+    'is_approved', 'is_available', 'total_jobs_completed', 'created_at',
+    ('rating', lambda mover: round(mover.rating, 1)),
+    ('review_count', lambda mover: mover.review_count if mover.review_count is not None else mover.reviews.count()),
+], mirrors=lambda mover: mover.to_dict())
+
+register('mover.with_contact', Mover, registry['mover'].fields + [
+    ('contact_email', related_field('user', 'email')),
+    ('contact_phone', related_field('user', 'phone_number')),
+    ('contact_name', related_field('user', 'full_name')),
+], mirrors=lambda mover: mover.to_dict(include_user=True))
+
+register('user', User, [
+    'id', 'email', 'full_name', 'phone_number', 'role', 'is_active', 'is_verified', 'profile_image_url',
+    'created_at',
+    ('mover_profile', lambda user: (
+        registry['mover'].one(user.mover_profile) if user.role == UserRole.MOVER and user.mover_profile else OMIT
+    )),
+], mirrors=lambda user: user.to_dict())
+
+register('booking', Booking, [
+    'id', 'booking_reference', 'status', 'pickup_address', 'pickup_floor', 'pickup_details',
+    'dropoff_address', 'dropoff_floor', 'dropoff_details', 'scheduled_date', 'scheduled_time',
+    'estimated_duration', 'distance_km', 'total_volume', 'items_count', 'special_instructions', 'created_at',
+    ('pricing', lambda booking: {
+        'base_price': booking.base_price,
+        'labor_cost': booking.labor_cost,
+        'packing_materials_cost': booking.packing_materials_cost,
+        'service_fee': booking.service_fee,
+        'total': booking.total_price
+    }),
+], mirrors=lambda booking: booking.to_dict())
+
+register('booking.admin', Booking, registry['booking'].fields + [
+    ('client', nested('user.contact', 'client')),
+    ('mover', nested('mover.with_contact', 'mover')),
+], mirrors=lambda booking: booking.to_dict(include_client=True, include_mover=True))
+
+def _sample_value(column):
+    """A non-null value of the column's Python type"""
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return None
+    if issubclass(python_type, Enum):
+        return list(python_type)[0]
+    return {
+        bool: True,
+        int: 7,
+        float: 4.25,
+        str: 'sample',
+        datetime: datetime(2026, 1, 2, 3, 4, 5, 678900),
+        date: date(2026, 1, 2),
+        time: time(9, 30),
+        list: ['sample'],
+        dict: ['sample'],
+    }.get(python_type)
+
+def _sample(model, **values):
+    """Transient instance with every column set, as if loaded from a query"""
+    columns = {attr.key: _sample_value(attr.columns[0]) for attr in model.__mapper__.column_attrs}
+    return model(**{**columns, **values})
+
+def sample_rows():
+    """Sample instances per model, covering the optional parts of each to_dict"""
+    client = _sample(User, id=1, role=UserRole.CLIENT)
+    mover_user = _sample(User, id=2, role=UserRole.MOVER)
+    mover = _sample(Mover, id=1, user=mover_user)
+    bare_mover = _sample(Mover, id=2)
+    return {
+        User: [client, mover_user, _sample(User, id=3, role=UserRole.MOVER)],
+        Mover: [mover, bare_mover],
+        Booking: [_sample(Booking, id=1, client=client, mover=mover), _sample(Booking, id=2)],
+    }
+
+def check_parity():
+    """
+    Compare every plan that mirrors a to_dict against it on sample rows, as
+    JSON. Returns a list of (plan name, difference) for plans that drifted.
+    """
+    rows = sample_rows()
+    problems = []
+    for name, serializer in registry.items():
+        if serializer.mirrors is None:
+            continue
+        for obj in rows[serializer.model]:
+            expected = json.loads(json.dumps(serializer.mirrors(obj)))
+            actual = orjson.loads(dumps_bytes(serializer.one(obj)))
+            if actual != expected:
+                missing = sorted(set(expected) - set(actual))
+                extra = sorted(set(actual) - set(expected))
+                changed = sorted(key for key in set(expected) & set(actual) if expected[key] != actual[key])
+                problems.append((name, f'missing {missing}, extra {extra}, changed {changed}'))
+                break
+    return problems
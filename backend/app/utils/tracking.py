@@ -0,0 +1,167 @@
+import os
+import threading
+from flask import current_app
+from sqlalchemy import func
+from app import db
+from app.models import BookingStatus, BookingStatusUpdate, LocationPing
+from app.utils.cache import TTLCache
+from app.utils.events import booking_topic, get_broker
+
+# booking_id -> latest ping dict; O(1) reads for tracking
+latest_positions = TTLCache(ttl=6 * 3600, maxsize=50000)
+
+class PingBuffer:
+    """
+    Collects GPS pings in memory and appends them in multi-row INSERTs,
+    either when PING_FLUSH_SIZE pings are waiting or every
+    PING_FLUSH_INTERVAL seconds. An interval of 0 flushes inline. Pings
+    received after their booking completed or was cancelled are dropped at
+    flush. Batches that fail to write are requeued, up to PING_BUFFER_MAX pings.
+    """
+    
+    def __init__(self):
+        self._rows = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._metrics = {'received': 0, 'written': 0, 'requeued': 0, 'dropped': 0, 'ended': 0, 'flushes': 0}
+    
+    def add(self, rows):
+        """Buffer pings (dicts of LocationPing columns) and track the newest position"""
+        config = current_app.config
+        with self._lock:
+            self._rows.extend(rows)
+            self._metrics['received'] += len(rows)
+            pending = len(self._rows)
+        
+        newest = max(rows, key=lambda row: row['recorded_at'])
+        remember_position(newest)
+        get_broker().publish(booking_topic(newest['booking_id']), {
+            'id': None,
+            'type': 'location',
+            'data': position_dict(newest)
+        })
+        
+        if config['PING_FLUSH_INTERVAL'] <= 0:
+            self.flush()
+        else:
+            self._ensure_flusher(current_app._get_current_object())
+            if pending >= config['PING_FLUSH_SIZE']:
+                self._wake.set()
+    
+    def flush(self):
+        """Write every buffered ping; returns how many were written"""
+        with self._lock:
+            rows, self._rows = self._rows, []
+        if not rows:
+            return 0
+        try:
+            written = self._write(rows)
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception('Could not write %d location pings; requeued', len(rows))
+            self._requeue(rows)
+            return 0
+        with self._lock:
+            self._metrics['written'] += written
+            self._metrics['ended'] += len(rows) - written
+            self._metrics['flushes'] += 1
+        return written
+    
+    def _write(self, rows):
+        """Insert the pings of bookings still running when they arrived; returns how many"""
+        rows = self._drop_ended(rows)
+        try:
+            LocationPing.insert_many(rows)
+        except Exception:
+            # Most likely a month with no partition yet: create it (and the
+            # DEFAULT partition) and retry once; inserts skip duplicates
+            db.session.rollback()
+            LocationPing.ensure_partitions(months_ahead=0, start=min(row['recorded_at'] for row in rows).date())
+            LocationPing.insert_many(rows)
+        return len(rows)
+    
+    def _drop_ended(self, rows):
+        """
+        Remove pings received after their booking completed or was cancelled.
+        Workers cache booking ownership, not status, so pings for a booking
+        that another worker just closed are accepted and filtered here.
+        """
+        ended_at = dict(db.session.query(
+            BookingStatusUpdate.booking_id, func.min(BookingStatusUpdate.created_at)
+        ).filter(
+            BookingStatusUpdate.booking_id.in_({row['booking_id'] for row in rows}),
+            BookingStatusUpdate.status.in_([BookingStatus.COMPLETED.value, BookingStatus.CANCELLED.value])
+        ).group_by(BookingStatusUpdate.booking_id).all())
+        if not ended_at:
+            return rows
+        return [
+            row for row in rows
+            if row['booking_id'] not in ended_at or row['received_at'] <= ended_at[row['booking_id']]
+        ]
+    
+    def _requeue(self, rows):
+        """Put a failed batch back ahead of newer pings, dropping the oldest past PING_BUFFER_MAX"""
+        limit = current_app.config['PING_BUFFER_MAX']
+        with self._lock:
+            self._rows[:0] = rows
+            self._metrics['requeued'] += len(rows)
+            overflow = len(self._rows) - limit
+            if overflow > 0:
+                del self._rows[:overflow]
+                self._metrics['dropped'] += overflow
+    
+    def stats(self):
+        with self._lock:
+            data = dict(self._metrics)
+            data['pending'] = len(self._rows)
+        return data
+    
+    def _ensure_flusher(self, app):
+        # One flusher thread per process; forked workers start their own
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, args=(app,), name='ping-flusher', daemon=True)
+            self._thread.start()
+    
+    def _run(self, app):
+        while True:
+            self._wake.wait(app.config['PING_FLUSH_INTERVAL'])
+            self._wake.clear()
+            with app.app_context():
+                self.flush()
+
+
+ping_buffer = PingBuffer()
+
+def position_dict(row):
+    return {
+        'latitude': row['latitude'],
+        'longitude': row['longitude'],
+        'accuracy_m': row.get('accuracy_m'),
+        'speed_kmh': row.get('speed_kmh'),
+        'heading': row.get('heading'),
+        'recorded_at': row['recorded_at'].isoformat(),
+    }
+
+def remember_position(row):
+    """Keep the newest ping per booking (out-of-order pings are ignored)"""
+    current = latest_positions.get(row['booking_id'])
+    if current is None or current['recorded_at'] <= row['recorded_at']:
+        latest_positions.set(row['booking_id'], row)
+
+def get_latest_position(booking_id):
+    """Latest known position for a booking, from memory or the newest stored ping"""
+    row = latest_positions.get(booking_id)
+    if row is None:
+        ping = LocationPing.latest_for(booking_id)
+        if ping is None:
+            return None
+        row = {column.name: getattr(ping, column.name) for column in LocationPing.__table__.columns}
+        remember_position(row)
+    return position_dict(row)
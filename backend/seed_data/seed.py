@@ -1,7 +1,8 @@
 from app import create_app, db
 from app.models import (
-    User, UserRole, Mover, Booking, BookingStatus,
-    InventoryTemplate, RoomType, Review, BookingStatusUpdate
+    User, UserRole, Mover, Booking, BookingStatus, MoverSlot,
+    InventoryTemplate, RoomType, Review, BookingStatusUpdate, BookingDailyStat,
+    PricingRule, PricingRuleType, LocationPing
 )
 from datetime import datetime, timedelta, time
 import random
@@ -65,6 +66,8 @@ def seed_database():
                 'vehicle': 'Truck (5 ton)',
                 'capacity': 15.0,
                 'zones': ['Nairobi', 'Kiambu', 'Westlands'],
+                'location': (-1.2676, 36.8108),
+                'radius_km': 30,
                 'base_price_km': 100,
                 'price_m3': 500,
                 'rating': 4.8,
@@ -78,6 +81,8 @@ def seed_database():
                 'vehicle': 'Truck (7 ton)',
                 'capacity': 20.0,
                 'zones': ['Nairobi', 'Mombasa', 'Nakuru'],
+                'location': (-1.2864, 36.8172),
+                'radius_km': 60,
                 'base_price_km': 120,
                 'price_m3': 600,
                 'rating': 4.9,
@@ -91,6 +96,8 @@ def seed_database():
                 'vehicle': 'Van (3 ton)',
                 'capacity': 10.0,
                 'zones': ['Nairobi', 'Kileleshwa', 'Parklands'],
+                'location': (-1.2806, 36.7846),
+                'radius_km': 25,
                 'base_price_km': 80,
                 'price_m3': 450,
                 'rating': 4.6,
@@ -104,6 +111,8 @@ def seed_database():
                 'vehicle': 'Truck (6 ton)',
                 'capacity': 18.0,
                 'zones': ['Nairobi', 'Karen', 'Lavington'],
+                'location': (-1.3197, 36.7073),
+                'radius_km': 30,
                 'base_price_km': 110,
                 'price_m3': 550,
                 'rating': 4.7,
@@ -139,10 +148,15 @@ def seed_database():
                 is_approved=True,
                 is_available=True,
                 rating=m_data['rating'],
-                total_jobs_completed=m_data['jobs']
+                total_jobs_completed=m_data['jobs'],
+                base_latitude=m_data['location'][0],
+                base_longitude=m_data['location'][1],
+                service_radius_km=m_data['radius_km']
             )
             movers.append(mover)
             db.session.add(mover)
+            db.session.flush()
+            mover.refresh_coverage_cells()
         
         # Create Pending Movers (for admin approval)
         pending_movers_data = [
@@ -244,6 +258,18 @@ def seed_database():
         
         db.session.commit()
         
+        # Create default pricing rules
+        print("💰 Creating pricing rules...")
+        pricing_rules = [
+            PricingRule(rule_type=PricingRuleType.LABOR_TIER, max_volume=5, value=1000),
+            PricingRule(rule_type=PricingRuleType.LABOR_TIER, max_volume=10, value=2000),
+            PricingRule(rule_type=PricingRuleType.LABOR_TIER, max_volume=None, value=3000),
+            PricingRule(rule_type=PricingRuleType.PACKING_RATE, value=100),
+            PricingRule(rule_type=PricingRuleType.SERVICE_FEE, value=0),
+        ]
+        db.session.add_all(pricing_rules)
+        db.session.commit()
+        
         # Create Sample Bookings
         print("📅 Creating bookings...")
         locations = [
@@ -328,6 +354,11 @@ def seed_database():
         
         db.session.commit()
         
+        print("📈 Building booking statistics...")
+        BookingDailyStat.rebuild()
+        MoverSlot.rebuild()
+        LocationPing.ensure_partitions()
+        
         print("✅ Database seeded successfully!")
         print("\n📊 Summary:")
         print(f"   - Users: {User.query.count()}")
@@ -8,11 +8,14 @@ export const bookingService = {
     return response.data;
   },
 
-  // Calculate price estimate
-  async calculateEstimate(moverId, distanceKm, totalVolume) {
+  // Calculate price estimate (distance is computed server-side from the coordinates)
+  async calculateEstimate(moverId, pickup, dropoff, totalVolume) {
     const response = await api.post('/bookings/estimate', {
       mover_id: moverId,
-      distance_km: distanceKm,
+      pickup_latitude: pickup.latitude,
+      pickup_longitude: pickup.longitude,
+      dropoff_latitude: dropoff.latitude,
+      dropoff_longitude: dropoff.longitude,
       total_volume: totalVolume,
     });
     return response.data;
@@ -34,7 +37,6 @@ export const bookingService = {
       dropoff_details: bookingData.dropoffDetails,
       scheduled_date: bookingData.scheduledDate,
       scheduled_time: bookingData.scheduledTime,
-      distance_km: bookingData.distanceKm,
       total_volume: bookingData.totalVolume,
       special_instructions: bookingData.specialInstructions,
     });